@@ -0,0 +1,41 @@
+"""event calendar
+
+Revision ID: 3d9b5f1e7a20
+Revises: a8c4e2f9b713
+Create Date: 2026-10-18 16:48:37.205114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b5f1e7a20'
+down_revision: Union[str, Sequence[str], None] = 'a8c4e2f9b713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_events_period', 'events',
+            [sa.text("tsrange(start_datetime, greatest(start_datetime, end_datetime), '[]')")],
+            unique=False, postgresql_using='gist',
+        )
+    else:
+        op.create_index('ix_events_end_datetime_start_datetime', 'events', ['end_datetime', 'start_datetime'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_events_period', table_name='events', postgresql_using='gist')
+    else:
+        op.drop_index('ix_events_end_datetime_start_datetime', table_name='events')
+    op.drop_column('events', 'updated_at')
@@ -0,0 +1,36 @@
+"""event listing indexes
+
+Revision ID: 4b7e9c1d2a3f
+Revises: 631d2e7af87c
+Create Date: 2026-10-18 10:12:41.208133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e9c1d2a3f'
+down_revision: Union[str, Sequence[str], None] = '631d2e7af87c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_start_datetime_id', 'events', ['start_datetime', 'id'], unique=False)
+    op.create_index(
+        'ix_events_active_start_datetime_id', 'events', ['start_datetime', 'id'], unique=False,
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active'),
+    )
+    op.create_index('ix_events_organizer_id_start_datetime_id', 'events', ['organizer_id', 'start_datetime', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_organizer_id_start_datetime_id', table_name='events')
+    op.drop_index('ix_events_active_start_datetime_id', table_name='events')
+    op.drop_index('ix_events_start_datetime_id', table_name='events')
@@ -0,0 +1,39 @@
+"""hot query indexes
+
+Revision ID: 5a8d3e7f1c26
+Revises: c31d7f5e0a94
+Create Date: 2026-10-18 13:41:52.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8d3e7f1c26'
+down_revision: Union[str, Sequence[str], None] = 'c31d7f5e0a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # get_current_user and login look users up by email on every request
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_event_registrations_event_id_status', 'event_registrations', ['event_id', 'status'], unique=False)
+    op.create_index(
+        'ix_event_registrations_waitlist', 'event_registrations', ['event_id', 'registered_at', 'id'], unique=False,
+        postgresql_where=sa.text("status = 'waitlist'"),
+        sqlite_where=sa.text("status = 'waitlist'"),
+    )
+    op.create_index('ix_event_registrations_user_id_status', 'event_registrations', ['user_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_registrations_user_id_status', table_name='event_registrations')
+    op.drop_index('ix_event_registrations_waitlist', table_name='event_registrations')
+    op.drop_index('ix_event_registrations_event_id_status', table_name='event_registrations')
+    op.drop_index('ix_users_email', table_name='users')
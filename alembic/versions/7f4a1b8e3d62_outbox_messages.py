@@ -0,0 +1,34 @@
+"""outbox messages
+
+Revision ID: 7f4a1b8e3d62
+Revises: e6b2c9d4f017
+Create Date: 2026-10-18 15:52:44.130528
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f4a1b8e3d62'
+down_revision: Union[str, Sequence[str], None] = 'e6b2c9d4f017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task', sa.String(length=200), nullable=False),
+    sa.Column('kwargs', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outbox_messages')
@@ -0,0 +1,53 @@
+"""atomic registration
+
+Revision ID: 9e2f6a0c8b51
+Revises: 4b7e9c1d2a3f
+Create Date: 2026-10-18 11:03:27.541902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2f6a0c8b51'
+down_revision: Union[str, Sequence[str], None] = '4b7e9c1d2a3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('confirmed_count', sa.Integer(), server_default='0', nullable=False))
+
+    # keep the oldest active registration per (event, user) before enforcing uniqueness
+    op.execute("""
+        UPDATE event_registrations SET status = 'cancelled'
+        WHERE status != 'cancelled' AND id NOT IN (
+            SELECT min(id) FROM event_registrations
+            WHERE status != 'cancelled'
+            GROUP BY event_id, user_id
+        )
+    """)
+    op.create_index(
+        'uq_event_registrations_event_id_user_id_active', 'event_registrations', ['event_id', 'user_id'],
+        unique=True,
+        postgresql_where=sa.text("status != 'cancelled'"),
+        sqlite_where=sa.text("status != 'cancelled'"),
+    )
+
+    op.execute("""
+        UPDATE events SET confirmed_count = (
+            SELECT count(*) FROM event_registrations
+            WHERE event_registrations.event_id = events.id
+            AND event_registrations.status = 'confirmed'
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_event_registrations_event_id_user_id_active', table_name='event_registrations')
+    op.drop_column('events', 'confirmed_count')
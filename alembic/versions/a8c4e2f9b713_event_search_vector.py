@@ -0,0 +1,43 @@
+"""event search vector
+
+Revision ID: a8c4e2f9b713
+Revises: 7f4a1b8e3d62
+Create Date: 2026-10-18 16:20:11.482907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e2f9b713'
+down_revision: Union[str, Sequence[str], None] = '7f4a1b8e3d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite deployments search through the in-process index in app.search
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(sa.text(
+        "ALTER TABLE events ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(location, '')), 'C')"
+        ") STORED"
+    ))
+    op.create_index('ix_events_search_vector', 'events', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_events_search_vector', table_name='events', postgresql_using='gin')
+    op.drop_column('events', 'search_vector')
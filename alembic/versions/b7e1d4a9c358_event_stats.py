@@ -0,0 +1,53 @@
+"""event stats
+
+Revision ID: b7e1d4a9c358
+Revises: 3d9b5f1e7a20
+Create Date: 2026-10-18 17:31:05.671249
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1d4a9c358'
+down_revision: Union[str, Sequence[str], None] = '3d9b5f1e7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_stats',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('registered', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('waitlist', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cancelled', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_table('event_hourly_stats',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('registrations', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cancellations', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.PrimaryKeyConstraint('event_id', 'hour')
+    )
+
+    # counters for existing events; hourly buckets are rebuilt by `python -m app.stats`
+    op.execute(sa.text(
+        "INSERT INTO event_stats (event_id, registered, waitlist, cancelled) "
+        "SELECT event_id, COUNT(*), "
+        "SUM(CASE WHEN status = 'waitlist' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) "
+        "FROM event_registrations GROUP BY event_id"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('event_hourly_stats')
+    op.drop_table('event_stats')
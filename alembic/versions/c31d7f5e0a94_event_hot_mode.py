@@ -0,0 +1,28 @@
+"""event hot mode
+
+Revision ID: c31d7f5e0a94
+Revises: 9e2f6a0c8b51
+Create Date: 2026-10-18 12:20:05.317640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c31d7f5e0a94'
+down_revision: Union[str, Sequence[str], None] = '9e2f6a0c8b51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('hot_mode', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'hot_mode')
@@ -0,0 +1,57 @@
+"""event archival
+
+Revision ID: d2a6f8c1e947
+Revises: b7e1d4a9c358
+Create Date: 2026-10-18 18:02:19.934610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f8c1e947'
+down_revision: Union[str, Sequence[str], None] = 'b7e1d4a9c358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.add_column('events', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_events_unarchived_end_datetime', 'events', ['end_datetime'], unique=False,
+        postgresql_where=sa.text('archived_at IS NULL'),
+        sqlite_where=sa.text('archived_at IS NULL'),
+    )
+
+    op.create_table('event_registrations_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('registered_at', sa.DateTime(), nullable=False),
+    # the type already exists, created with event_registrations
+    sa.Column('status', postgresql.ENUM('confirmed', 'cancelled', 'waitlist', name='registrationstatus', create_type=False), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_event_registrations_archive_event_id', 'event_registrations_archive', ['event_id'], unique=False)
+    op.create_index('ix_event_registrations_archive_user_id', 'event_registrations_archive', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_registrations_archive_user_id', table_name='event_registrations_archive')
+    op.drop_index('ix_event_registrations_archive_event_id', table_name='event_registrations_archive')
+    op.drop_table('event_registrations_archive')
+    op.drop_index(
+        'ix_events_unarchived_end_datetime', table_name='events',
+        postgresql_where=sa.text('archived_at IS NULL'),
+        sqlite_where=sa.text('archived_at IS NULL'),
+    )
+    op.drop_column('events', 'archived_at')
+    op.drop_column('events', 'deleted_at')
@@ -0,0 +1,42 @@
+"""notification fanouts
+
+Revision ID: e6b2c9d4f017
+Revises: 5a8d3e7f1c26
+Create Date: 2026-10-18 15:08:13.662051
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2c9d4f017'
+down_revision: Union[str, Sequence[str], None] = '5a8d3e7f1c26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_fanouts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.String(length=2000), nullable=False),
+    sa.Column('last_registration_id', sa.Integer(), nullable=False),
+    sa.Column('dispatched', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_fanouts_event_id', 'notification_fanouts', ['event_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_fanouts_event_id', table_name='notification_fanouts')
+    op.drop_table('notification_fanouts')
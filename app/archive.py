@@ -0,0 +1,90 @@
+"""Archival of registrations that belong to finished or deleted events.
+
+Registrations of events that ended, or were soft-deleted, more than
+ARCHIVE_AFTER_DAYS ago are moved to event_registrations_archive in batches,
+so event_registrations and its indexes only hold the live working set.
+Runs from Celery beat, or by hand:
+
+    python -m app.archive
+"""
+import argparse
+from datetime import timedelta
+
+from sqlalchemy import delete, insert, literal, or_, select
+
+from app.database import SessionLocal
+from app.models import ArchivedEventRegistration, Event, EventRegistration
+from app.models.models import utcnow
+from app.settings import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+ARCHIVED_COLUMNS = ["id", "user_id", "event_id", "registered_at", "status"]
+
+# events picked per run, each archived in its own transactions
+EVENTS_PER_RUN = 1000
+
+
+def archivable_events(db, after_days: int = ARCHIVE_AFTER_DAYS, limit: int = EVENTS_PER_RUN) -> list[int]:
+    cutoff = utcnow() - timedelta(days=after_days)
+    return db.scalars(select(Event.id).where(
+        Event.archived_at.is_(None),
+        # hot events still have decisions pending in Redis
+        Event.hot_mode == False,
+        or_(Event.end_datetime < cutoff, Event.deleted_at < cutoff),
+    ).order_by(Event.end_datetime).limit(limit)).all()
+
+
+def archive_event(db, event_id: int, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Moves one event's registrations in batches, returns how many moved.
+
+    Each batch is a transaction holding the event row lock, which keeps
+    registration writes for the event out while rows move. The event is
+    marked archived once none are left.
+    """
+    moved = 0
+    while True:
+        event = db.scalar(select(Event).where(
+            Event.id == event_id,
+            Event.archived_at.is_(None),
+        ).with_for_update(skip_locked=True))
+        if event is None:
+            return moved
+
+        ids = db.scalars(select(EventRegistration.id).where(
+            EventRegistration.event_id == event_id
+        ).order_by(EventRegistration.id).limit(batch_size)).all()
+        if not ids:
+            event.archived_at = utcnow()
+            db.commit()
+            return moved
+
+        db.execute(insert(ArchivedEventRegistration).from_select(
+            ARCHIVED_COLUMNS + ["archived_at"],
+            # naive UTC from the app clock like every other timestamp, SQL now() is server local time
+            select(*(getattr(EventRegistration, column) for column in ARCHIVED_COLUMNS), literal(utcnow())).where(
+                EventRegistration.id.in_(ids)
+            ),
+        ))
+        db.execute(delete(EventRegistration).where(EventRegistration.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+
+def archive_events(after_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archives every eligible event, returns the number of registrations moved."""
+    moved = 0
+    with SessionLocal() as db:
+        for event_id in archivable_events(db, after_days):
+            moved += archive_event(db, event_id, batch_size)
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move registrations of past events to the archive table.")
+    parser.add_argument("--after-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    print(f"archived {archive_events(args.after_days, args.batch_size)} registrations")
+
+
+if __name__ == "__main__":
+    main()
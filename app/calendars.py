@@ -0,0 +1,166 @@
+"""Time-window event queries and the per-user iCalendar feed."""
+import hashlib
+from datetime import UTC, datetime, timedelta
+
+from jose import JWTError, jwt
+from sqlalchemy import func, literal_column, select
+
+from app.models import Event, EventRegistration
+from app.models.models import RegistrationStatus as Status
+from app.settings import ALGORITHM, SECRET_KEY
+
+FEED_COLUMNS = [
+    Event.id, Event.title, Event.description, Event.location,
+    Event.start_datetime, Event.end_datetime, Event.max_participants, Event.is_active,
+]
+
+CALENDAR_TOKEN_DAYS = 365
+
+
+def overlapping(dialect: str, start: datetime, end: datetime):
+    """Events whose [start_datetime, end_datetime] overlaps [start, end).
+
+    On Postgres the expression matches the GiST index ix_events_period, so
+    its bounds are rendered inline rather than bound.
+    """
+    if dialect == "postgresql":
+        period = func.tsrange(
+            Event.start_datetime,
+            func.greatest(Event.start_datetime, Event.end_datetime),
+            literal_column("'[]'"),
+        )
+        return period.op("&&")(func.tsrange(start, end, literal_column("'[)'")))
+    return (Event.end_datetime >= start) & (Event.start_datetime < end)
+
+
+def window_query(dialect: str, start: datetime, end: datetime):
+    return select(*FEED_COLUMNS).where(
+        Event.is_active == True,
+        overlapping(dialect, start, end),
+    ).order_by(Event.start_datetime, Event.id)
+
+
+def create_calendar_token(user_id: int):
+    # carries no "email" claim, so it can never pass for an access token
+    payload = {
+        "sub": str(user_id),
+        "scope": "calendar",
+        "exp": datetime.now(UTC) + timedelta(days=CALENDAR_TOKEN_DAYS),
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def read_calendar_token(token: str):
+    """Returns the user id of a calendar token, or None if it is not valid."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("scope") != "calendar":
+        return None
+    return int(payload["sub"])
+
+
+def calendar_query(user_id: int):
+    return select(
+        Event.id, Event.title, Event.description, Event.location,
+        Event.start_datetime, Event.end_datetime, Event.is_active,
+        Event.updated_at, EventRegistration.status,
+    ).join(EventRegistration, EventRegistration.event_id == Event.id).where(
+        EventRegistration.user_id == user_id,
+        EventRegistration.status != Status.cancelled,
+    ).order_by(Event.start_datetime, Event.id)
+
+
+async def calendar_etag(db, user_id: int) -> str:
+    """Validator for a user's feed, from one aggregate over their registrations.
+
+    Registering, cancelling or a promotion changes the counts or the id sum,
+    an event edit moves the latest updated_at.
+    """
+    row = (await db.execute(select(
+        func.count(),
+        func.coalesce(func.sum(EventRegistration.id), 0),
+        func.count().filter(EventRegistration.status == Status.confirmed),
+        func.max(Event.updated_at),
+    ).select_from(EventRegistration).join(Event, EventRegistration.event_id == Event.id).where(
+        EventRegistration.user_id == user_id,
+        EventRegistration.status != Status.cancelled,
+    ))).one()
+    digest = hashlib.sha1(repr((user_id, *row)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _escape(text: str | None) -> str:
+    if not text:
+        return ""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    # RFC 5545: content lines are split at 75 octets, continuations start with a space
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        # do not split inside a UTF-8 sequence
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(value: datetime) -> str:
+    # stored naive, in UTC
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(row, host: str) -> str:
+    if not row.is_active:
+        status = "CANCELLED"
+    elif row.status == Status.confirmed:
+        status = "CONFIRMED"
+    else:
+        status = "TENTATIVE"
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{row.id}@{host}",
+        f"DTSTAMP:{_stamp(row.updated_at)}",
+        f"LAST-MODIFIED:{_stamp(row.updated_at)}",
+        f"DTSTART:{_stamp(row.start_datetime)}",
+        f"DTEND:{_stamp(max(row.start_datetime, row.end_datetime))}",
+        f"SUMMARY:{_escape(row.title)}",
+        f"STATUS:{status}",
+    ]
+    if row.description:
+        lines.append(f"DESCRIPTION:{_escape(row.description)}")
+    if row.location:
+        lines.append(f"LOCATION:{_escape(row.location)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+async def ics_lines(batches, host: str):
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Event Management System//EN\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "X-WR-CALNAME:My events\r\n"
+    ).encode()
+    async for rows in batches:
+        yield "".join(_vevent(row, host) for row in rows).encode()
+    yield b"END:VCALENDAR\r\n"
@@ -1,25 +1,251 @@
+import asyncio
+import logging
 import os
+import random
+import time
+from contextlib import asynccontextmanager, nullcontext
 
-from sqlalchemy import create_engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DB_NAME=os.getenv("DB_NAME")
 DB_USER=os.getenv("DB_USER")
 DB_PASSWORD=os.getenv("DB_PASSWORD")
 DB_HOST=os.getenv("DB_HOST")
 DB_PORT=os.getenv("DB_PORT")
 
-DB_URL=f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DB_URL=os.getenv("DB_URL") or f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# "async" serves requests through AsyncSession (asyncpg / aiosqlite),
+# "sync" keeps the psycopg2 Session and runs its calls in the threadpool.
+DB_MODE=os.getenv("DB_MODE", "async")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+ASYNC_DB_URL=os.getenv("ASYNC_DB_URL") or to_async_url(DB_URL)
 
+# logs every statement synchronously, for local debugging only;
+# slow statements are always reported by app.profiler
+DB_ECHO=os.getenv("DB_ECHO", "false").lower() == "true"
 
-engine =create_engine(DB_URL, echo=True)
+
+engine =create_engine(DB_URL, echo=DB_ECHO)
 SessionLocal= sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DB_URL, echo=DB_ECHO) if DB_MODE == "async" else None
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# read replicas, comma separated, with optional matching relative weights
+DB_REPLICA_URLS=[url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_WEIGHTS=[float(weight) for weight in os.getenv("DB_REPLICA_WEIGHTS", "").split(",") if weight.strip()]
+# a replica that failed or lags more than this is skipped until a later check passes
+DB_REPLICA_MAX_LAG_SECONDS=float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_INTERVAL=float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+DB_REPLICA_RETRY_SECONDS=float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+# after a write the user's reads stay on the primary this long, to see their own changes
+DB_REPLICA_STICKY_SECONDS=float(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
+
+# 0 while caught up, else seconds since the last replayed transaction; NULL on a primary
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class Replica:
+    """A read replica engine with its load and health state."""
+
+    def __init__(self, url: str, weight: float):
+        self.url = url
+        self.weight = weight
+        self.in_flight = 0
+        # monotonic time before which the replica is not used
+        self.down_until = 0.0
+
+        if DB_MODE == "async":
+            self.engine = create_async_engine(to_async_url(url), echo=DB_ECHO, pool_pre_ping=True)
+            self.sessionmaker = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+            self.sync_engine = self.engine.sync_engine
+        else:
+            self.engine = self.sync_engine = create_engine(url, echo=DB_ECHO, pool_pre_ping=True)
+            self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        event.listen(self.sync_engine, "handle_error", self._on_error)
+
+    def mark_down(self, reason: str):
+        logger.warning("Replica %s unavailable (%s), reads fall back", self.engine.url.host, reason)
+        self.down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down("connection error")
+
+    @staticmethod
+    def _lag(conn) -> float:
+        if conn.dialect.name != "postgresql":
+            conn.execute(text("SELECT 1"))
+            return 0.0
+        return float(conn.execute(REPLICA_LAG_SQL).scalar() or 0.0)
+
+    def _sync_lag(self) -> float:
+        with self.engine.connect() as conn:
+            return self._lag(conn)
+
+    async def check(self):
+        try:
+            if DB_MODE == "async":
+                async with self.engine.connect() as conn:
+                    lag = await conn.run_sync(self._lag)
+            else:
+                lag = await run_in_threadpool(self._sync_lag)
+        except Exception:
+            self.mark_down("health check failed")
+            return
+
+        if lag > DB_REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(f"lagging {lag:.1f}s")
+        else:
+            self.down_until = 0.0
+
+
+replicas = [
+    Replica(url, DB_REPLICA_WEIGHTS[i] if i < len(DB_REPLICA_WEIGHTS) else 1.0)
+    for i, url in enumerate(DB_REPLICA_URLS)
+]
+_next_check = 0.0
+_check_task = None
+
+
+async def check_replicas():
+    await asyncio.gather(*(replica.check() for replica in replicas))
+
+
+def pick_replica():
+    """Least loaded healthy replica relative to its weight, None to use the primary."""
+    global _next_check, _check_task
+    if not replicas:
+        return None
+
+    now = time.monotonic()
+    if now >= _next_check:
+        # checks run in the background, never on the request path
+        _next_check = now + DB_REPLICA_CHECK_INTERVAL
+        _check_task = asyncio.get_running_loop().create_task(check_replicas())
+
+    healthy = [replica for replica in replicas if replica.down_until <= now]
+    if not healthy:
+        return None
+    return min(healthy, key=lambda replica: ((replica.in_flight + 1) / replica.weight, random.random()))
+
+
+class SyncSessionAdapter:
+    """Gives a sync Session the awaitable interface of AsyncSession.
+
+    Blocking calls are pushed to the threadpool so routers can be written
+    once against the async API while DB_MODE=sync is still in use.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def __getattr__(self, name):
+        attr = getattr(self.sync_session, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(attr, *args, **kwargs)
+
+        return call
+
+
+# engine -> (event loop, semaphore) capping the sync sessions in flight on it
+_sync_slots: dict = {}
+
+
+def _sync_slot(engine):
+    """Semaphore sized to the engine's pool, None when the pool is unbounded.
+
+    A sync Session keeps its connection across every await of the request,
+    so more sessions than connections would leave the threadpool blocked in
+    pool.connect() while the sessions holding connections wait for a thread.
+    """
+    loop = asyncio.get_running_loop()
+    slot = _sync_slots.get(engine)
+    if slot is None or slot[0] is not loop:
+        pool = engine.pool
+        capacity = pool.size() + pool._max_overflow if isinstance(pool, QueuePool) and pool._max_overflow >= 0 else 0
+        slot = _sync_slots[engine] = (loop, asyncio.Semaphore(capacity) if capacity else None)
+    return slot[1] or nullcontext()
+
+
+@asynccontextmanager
+async def open_session(readonly: bool = False):
+    """Session on the primary, or on a replica for readonly work when one is healthy."""
+    replica = pick_replica() if readonly else None
+    if replica is not None:
+        replica.in_flight += 1
+
+    try:
+        if DB_MODE == "async":
+            async with (replica.sessionmaker if replica else AsyncSessionLocal)() as db:
+                db.info["replica"] = replica is not None
+                yield db
+            return
+
+        async with _sync_slot(replica.engine if replica else engine):
+            db = (replica.sessionmaker if replica else SessionLocal)()
+            db.info["replica"] = replica is not None
+            try:
+                yield SyncSessionAdapter(db)
+            finally:
+                await run_in_threadpool(db.close)
+    finally:
+        if replica is not None:
+            replica.in_flight -= 1
+
+
+async def stream_partitions(db, statement, batch_size: int = 1000):
+    """Yields row batches from a server-side cursor, holding one batch in memory."""
+    statement = statement.execution_options(yield_per=batch_size)
+
+    if isinstance(db, SyncSessionAdapter):
+        partitions = (await db.execute(statement)).partitions()
+        while batch := await run_in_threadpool(next, partitions, None):
+            yield batch
+        return
 
+    result = await db.stream(statement)
+    async for batch in result.partitions():
+        yield batch
 
 
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
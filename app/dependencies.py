@@ -1,36 +1,123 @@
+import math
+import time
 from typing import Annotated
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import SessionLocal
+from app.database import DB_REPLICA_STICKY_SECONDS, open_session, replicas
 from app.models import User
+from app.principals import get_principal, set_principal
+from app.redis_client import redis_client
+from app.schemas.schemas import Principal, UTCDateTime
 from app.settings import ALGORITHM, SECRET_KEY
 
 # oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 dbearer_scheme = HTTPBearer(auto_error=False)
 
 
-async def pagination_depedency(q: str | None = None, offset: int = 0, limit: int = 100):
-    return {"q": q, "offset": offset, "limit": limit}
+async def pagination_depedency(
+    q: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+):
+    return {"q": q, "cursor": cursor, "limit": limit}
+
+
+async def event_filters_depedency(
+    is_active: bool | None = None,
+    upcoming: bool = False,
+    organizer_id: int | None = None,
+    starts_after: UTCDateTime | None = None,
+    starts_before: UTCDateTime | None = None,
+):
+    return {
+        "is_active": is_active,
+        "upcoming": upcoming,
+        "organizer_id": organizer_id,
+        "starts_after": starts_after,
+        "starts_before": starts_before,
+    }
+
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# writer key -> monotonic time until which its reads go to the primary
+_recent_writers: dict[str, float] = {}
+
+
+def _writer_key(request: Request) -> str:
+    # unverified on purpose: a forged claim can only route reads to the primary
+    authorization = request.headers.get("authorization", "")
+    if authorization.startswith("Bearer "):
+        try:
+            email = jwt.get_unverified_claims(authorization[7:]).get("email")
+        except JWTError:
+            email = None
+        if email:
+            return f"user:{email}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def remember_write(key: str):
+    now = time.monotonic()
+    if len(_recent_writers) > 10000:
+        for stale in [k for k, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[stale]
+    _recent_writers[key] = now + DB_REPLICA_STICKY_SECONDS
+
+    # shared so the next read is sticky on whichever worker serves it
+    if redis_client is not None:
+        try:
+            await redis_client.set(f"primary_reads:{key}", 1, ex=math.ceil(DB_REPLICA_STICKY_SECONDS))
+        except RedisError:
+            pass
+
+
+async def recently_wrote(key: str) -> bool:
+    if _recent_writers.get(key, 0) > time.monotonic():
+        return True
+    if redis_client is None:
+        return False
+    try:
+        return bool(await redis_client.exists(f"primary_reads:{key}"))
+    except RedisError:
+        # cannot tell, the primary is always consistent
+        return True
+
+
+async def get_db(request: Request):
+    """Session for the request: safe methods read from a replica when one is configured."""
+    readonly = False
+    if replicas:
+        key = _writer_key(request)
+        if request.method in SAFE_METHODS:
+            readonly = not await recently_wrote(key)
+        else:
+            await remember_write(key)
+
+    async with open_session(readonly=readonly) as db:
+        yield db
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_primary_db():
+    """For safe-method routes that write."""
+    async with open_session() as db:
         yield db
-    finally:
-        db.close()
 
 
 pagination_dep = Annotated[dict, Depends(pagination_depedency)]
-db_dep = Annotated[Session, Depends(get_db)]
+event_filters_dep = Annotated[dict, Depends(event_filters_depedency)]
+db_dep = Annotated[AsyncSession, Depends(get_db)]
+primary_db_dep = Annotated[AsyncSession, Depends(get_primary_db)]
 # oauth2_dep = Annotated[str, Depends(oauth2_scheme)]
 
 
-def get_current_user(db: db_dep, credentials: HTTPAuthorizationCredentials = Depends(dbearer_scheme)):
+async def get_current_user(db: db_dep, credentials: HTTPAuthorizationCredentials = Depends(dbearer_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -52,11 +139,17 @@ def get_current_user(db: db_dep, credentials: HTTPAuthorizationCredentials = Dep
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-        user = db.query(User).filter(User.email == email).first()
+        principal = await get_principal(email)
+        if principal is not None:
+            return principal
+
+        user = await db.scalar(select(User).where(User.email == email))
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
-        return user
+        principal = Principal.model_validate(user)
+        await set_principal(principal)
+        return principal
 
     except JWTError as err:
         raise HTTPException(status_code=401, detail="Invalid refresh token") from err
@@ -66,4 +159,4 @@ def get_current_user(db: db_dep, credentials: HTTPAuthorizationCredentials = Dep
         ) from err
 
 
-current_user_dep = Annotated[bool, Depends(get_current_user)]
\ No newline at end of file
+current_user_dep = Annotated[Principal, Depends(get_current_user)]
\ No newline at end of file
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from redis.exceptions import RedisError
+
+from app.cache import LRUCache
+from app.redis_client import redis_client
+from app.settings import EVENT_CACHE_LOCAL_TTL, EVENT_CACHE_SIZE, EVENT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+LISTING_KEY = "events:listing"
+# incremented by every invalidation, in any worker
+GENERATION_KEY = "events:generation"
+
+# stores an entry only if no invalidation ran since its load started
+WRITE_IF_CURRENT_LUA = """
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[1] then
+  return 0
+end
+if ARGV[2] == '' then
+  redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+else
+  -- listing pages share one hash so a write drops them all at once
+  redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+  if redis.call('TTL', KEYS[2]) < 0 then
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+  end
+end
+return 1
+"""
+
+detail_cache = LRUCache(maxsize=EVENT_CACHE_SIZE, ttl=EVENT_CACHE_LOCAL_TTL)
+listing_cache = LRUCache(maxsize=EVENT_CACHE_SIZE, ttl=EVENT_CACHE_LOCAL_TTL)
+
+stats = {
+    "redis_hits": 0,
+    "redis_misses": 0,
+    "loads": 0,
+    "coalesced": 0,
+    "redis_errors": 0,
+    "stale_skipped": 0,
+    "served": 0,
+    "age_total": 0.0,
+    "age_max": 0.0,
+}
+
+_inflight: dict[str, asyncio.Future] = {}
+# local tier counterpart of GENERATION_KEY, for this worker's own writes
+_generation = 0
+_write_if_current = redis_client.register_script(WRITE_IF_CURRENT_LUA) if redis_client is not None else None
+
+
+def _detail_key(event_id: int):
+    return f"event:{event_id}:detail"
+
+
+def listing_key(params: dict):
+    raw = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _pack(entry):
+    cached_at, payload = entry
+    return f"{cached_at}\n".encode() + payload
+
+
+def _unpack(raw: bytes):
+    cached_at, payload = raw.split(b"\n", 1)
+    return float(cached_at), payload
+
+
+async def _redis_write(key: str, field: str | None, entry, generation: bytes | None):
+    """Writes the shared entry unless another worker invalidated since generation was read."""
+    if _write_if_current is None:
+        return
+    try:
+        written = await _write_if_current(
+            keys=[GENERATION_KEY, key],
+            args=[generation or b"", field or "", _pack(entry), EVENT_CACHE_TTL],
+        )
+    except RedisError:
+        logger.warning("Event cache: redis unavailable", exc_info=True)
+        stats["redis_errors"] += 1
+        return
+    if not written:
+        stats["stale_skipped"] += 1
+
+
+async def _redis_lookup(key: str, field: str | None):
+    """(cached entry or None, current generation) in one round trip."""
+    if redis_client is None:
+        return None, None
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            if field is None:
+                pipe.get(key)
+            else:
+                pipe.hget(key, field)
+            pipe.get(GENERATION_KEY)
+            raw, generation = await pipe.execute()
+    except RedisError:
+        logger.warning("Event cache: redis unavailable", exc_info=True)
+        stats["redis_errors"] += 1
+        return None, None
+    return raw, generation
+
+
+async def shared_generation() -> bytes | None:
+    """GENERATION_KEY as last incremented by any worker, None without Redis."""
+    if redis_client is None:
+        return None
+    try:
+        return await redis_client.get(GENERATION_KEY)
+    except RedisError:
+        logger.warning("Event cache: redis unavailable", exc_info=True)
+        stats["redis_errors"] += 1
+        return None
+
+
+async def _load_once(flight_key: str, loader):
+    """Runs loader once per key in this worker; concurrent misses share its result."""
+    future = _inflight.get(flight_key)
+    if future is not None:
+        stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[flight_key] = future
+    stats["loads"] += 1
+    try:
+        payload = await loader()
+    except Exception as err:
+        future.set_exception(err)
+        # mark retrieved so a failed load without waiters is not logged
+        future.exception()
+        raise
+    else:
+        future.set_result(payload)
+        return payload
+    finally:
+        if not future.done():
+            future.cancel()
+        del _inflight[flight_key]
+
+
+async def _read_through(local: LRUCache, local_key: str, redis_key: str, field: str | None, loader):
+    entry = local.get(local_key)
+
+    shared_generation = None
+    if entry is None:
+        # the generation is read before the database, so a write committed during the load is seen
+        raw, shared_generation = await _redis_lookup(redis_key, field)
+        if raw is not None:
+            stats["redis_hits"] += 1
+            entry = _unpack(raw)
+            local.set(local_key, entry)
+        elif redis_client is not None:
+            stats["redis_misses"] += 1
+
+    if entry is None:
+        generation = _generation
+        # loads never coalesce across an invalidation, a late joiner would store the old payload
+        flight_key = f"{redis_key}:{field or ''}:{generation}:{shared_generation}"
+        payload = await _load_once(flight_key, loader)
+        if payload is None:
+            return None
+
+        entry = (time.time(), payload)
+        if generation == _generation:
+            local.set(local_key, entry)
+            await _redis_write(redis_key, field, entry, shared_generation)
+
+    age = time.time() - entry[0]
+    stats["served"] += 1
+    stats["age_total"] += age
+    stats["age_max"] = max(stats["age_max"], age)
+    return entry[1]
+
+
+async def cached_event(event_id: int, loader) -> bytes | None:
+    """Serialized EventOut for event_id; loader returns the JSON bytes or None if missing."""
+    return await _read_through(detail_cache, str(event_id), _detail_key(event_id), None, loader)
+
+
+async def cached_listing(params: dict, loader) -> bytes:
+    """Serialized EventPage for the listing params; loader returns the JSON bytes."""
+    key = listing_key(params)
+    return await _read_through(listing_cache, key, LISTING_KEY, key, loader)
+
+
+async def invalidate_event(event_id: int):
+    """Drops an event's detail entry and every cached listing page.
+
+    Runs on every event write, cache enabled or not: the shared generation
+    it increments also tells app.search that its index is out of date.
+    """
+    global _generation
+    _generation += 1
+    detail_cache.delete(str(event_id))
+    listing_cache.clear()
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(GENERATION_KEY)
+            pipe.delete(_detail_key(event_id), LISTING_KEY)
+            await pipe.execute()
+    except RedisError:
+        logger.warning("Event cache: redis unavailable", exc_info=True)
+        stats["redis_errors"] += 1
+
+
+def event_cache_stats():
+    local_hits = detail_cache.hits + listing_cache.hits
+    served = stats["served"]
+    return {
+        "local": {"detail": detail_cache.stats(), "listing": listing_cache.stats()},
+        "redis": {key: stats[key] for key in ("redis_hits", "redis_misses", "redis_errors", "stale_skipped")},
+        "loads": stats["loads"],
+        "coalesced": stats["coalesced"],
+        "hit_ratio": (local_hits + stats["redis_hits"]) / served if served else None,
+        "staleness_seconds": {
+            "avg": stats["age_total"] / served if served else None,
+            "max": stats["age_max"],
+        },
+    }
@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+import zlib
+from enum import Enum
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def ndjson_lines(batches):
+    async for rows in batches:
+        yield "".join(
+            json.dumps({key: _plain(value) for key, value in row._mapping.items()}) + "\n"
+            for row in rows
+        ).encode()
+
+
+async def csv_lines(batches, header: list[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    async for rows in batches:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # header only, when there were no rows
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from celery import group
+from sqlalchemy import and_, or_, select, update
+
+from app.database import SessionLocal
+from app.models import Event, EventRegistration, NotificationFanout, User
+from app.models.models import RegistrationStatus as Status, utcnow
+from app.settings import FANOUT_BATCH_SIZE, FANOUT_CHUNK_SIZE, FANOUT_STALE_SECONDS
+from app.stats import rebuild_counters
+
+# fields whose change is worth telling registrants about
+NOTIFY_FIELDS = ("start_datetime", "end_datetime", "location")
+
+
+def event_changed_fanout(event: Event):
+    return NotificationFanout(
+        event_id=event.id,
+        kind="updated",
+        subject=f"Event updated: {event.title}",
+        body=(
+            f"{event.title} has changed.\n"
+            f"When: {event.start_datetime:%Y-%m-%d %H:%M} - {event.end_datetime:%Y-%m-%d %H:%M}\n"
+            f"Where: {event.location or 'TBA'}"
+        ),
+    )
+
+
+def event_deleted_fanout(event: Event):
+    return NotificationFanout(
+        event_id=event.id,
+        kind="deleted",
+        subject=f"Event cancelled: {event.title}",
+        body=f"{event.title} has been cancelled by the organizer.",
+    )
+
+
+def _claim(db, fanout_id: int) -> bool:
+    now = utcnow()
+    stale_before = now - timedelta(seconds=FANOUT_STALE_SECONDS)
+    claimed = db.execute(update(NotificationFanout).where(
+        NotificationFanout.id == fanout_id,
+        or_(
+            NotificationFanout.status == "pending",
+            and_(NotificationFanout.status == "running", NotificationFanout.updated_at < stale_before),
+        ),
+    ).values(status="running", updated_at=now))
+    db.commit()
+    return claimed.rowcount == 1
+
+
+def run_fanout(fanout_id: int, send_bulk_emails):
+    """Streams an event's registrants in id order and dispatches batched sends.
+
+    Progress is committed after every chunk, so a fan-out that dies part way
+    resumes after the last dispatched registration (a chunk may go out twice).
+    A "deleted" fan-out cancels the remaining registrations once everyone has been told.
+    """
+    with SessionLocal() as db:
+        if not _claim(db, fanout_id):
+            return
+        fanout = db.get(NotificationFanout, fanout_id)
+
+        while True:
+            rows = db.execute(select(EventRegistration.id, User.email).join(
+                User, User.id == EventRegistration.user_id
+            ).where(
+                EventRegistration.event_id == fanout.event_id,
+                EventRegistration.status != Status.cancelled,
+                EventRegistration.id > fanout.last_registration_id,
+            ).order_by(EventRegistration.id).limit(FANOUT_CHUNK_SIZE)).all()
+            if not rows:
+                break
+
+            messages = [
+                {"to_email": email, "subject": fanout.subject, "body": fanout.body}
+                for _, email in rows
+            ]
+            group(
+                send_bulk_emails.s(messages[start:start + FANOUT_BATCH_SIZE])
+                for start in range(0, len(messages), FANOUT_BATCH_SIZE)
+            ).apply_async()
+
+            fanout.last_registration_id = rows[-1].id
+            fanout.dispatched += len(rows)
+            fanout.updated_at = utcnow()
+            db.commit()
+
+        if fanout.kind == "deleted":
+            # the event stays soft-deleted; app.archive moves its registrations later
+            db.execute(update(EventRegistration).where(
+                EventRegistration.event_id == fanout.event_id,
+                EventRegistration.status != Status.cancelled,
+            ).values(status=Status.cancelled))
+            rebuild_counters(db, [fanout.event_id])
+
+        fanout.status = "done"
+        fanout.updated_at = utcnow()
+        db.commit()
+
+
+def unfinished_fanouts() -> list[int]:
+    stale_before = utcnow() - timedelta(seconds=FANOUT_STALE_SECONDS)
+    with SessionLocal() as db:
+        return db.scalars(select(NotificationFanout.id).where(
+            NotificationFanout.status != "done",
+            NotificationFanout.updated_at < stale_before,
+        )).all()
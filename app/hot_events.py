@@ -0,0 +1,285 @@
+"""Flash-sale ("hot") mode for events.
+
+While an event is hot its seat counter, active members and waitlist live in
+Redis and every registration is decided by one Lua script. Each decision is
+appended to a pending list that `reconcile_hot_event` persists to the
+database in batches, so RegistrationStatus semantics match the SQL path.
+"""
+import json
+from datetime import datetime
+from itertools import groupby
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import SessionLocal
+from app.models import Event, EventRegistration
+from app.models.models import RegistrationStatus as Status, utcnow
+from app.redis_client import redis_client, sync_redis_client
+from app.registrations import ACTIVE_REGISTRATION
+from app.settings import HOT_EVENT_RECONCILE_BATCH
+from app.stats import hourly_update, rebuild_counters, to_hour
+
+HOT_EVENTS_KEY = "hot_events"
+
+# KEYS: seats, members, waitlist, pending, closed, hot_events
+PROMOTE = """
+local function promote(now)
+  local seats = tonumber(redis.call('GET', KEYS[1]))
+  while seats > 0 do
+    local user = redis.call('LPOP', KEYS[3])
+    if not user then break end
+    if redis.call('HGET', KEYS[2], user) == 'waitlist' then
+      redis.call('HSET', KEYS[2], user, 'confirmed')
+      redis.call('RPUSH', KEYS[4], cjson.encode({op = 'promote', user_id = tonumber(user), at = now}))
+      seats = redis.call('DECR', KEYS[1])
+    end
+  end
+end
+"""
+
+SCRIPTS = {
+    # ARGV: user_id, now
+    "register": """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 'cold' end
+if redis.call('EXISTS', KEYS[5]) == 1 then return 'closed' end
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 1 then return 'duplicate' end
+local status = 'waitlist'
+if tonumber(redis.call('GET', KEYS[1])) > 0 then
+  redis.call('DECR', KEYS[1])
+  status = 'confirmed'
+else
+  redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+redis.call('HSET', KEYS[2], ARGV[1], status)
+redis.call('RPUSH', KEYS[4], cjson.encode({op = 'register', user_id = tonumber(ARGV[1]), status = status, at = ARGV[2]}))
+return status
+""",
+    # ARGV: user_id, now
+    "cancel": PROMOTE + """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 'cold' end
+local status = redis.call('HGET', KEYS[2], ARGV[1])
+if not status then return 'none' end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('RPUSH', KEYS[4], cjson.encode({op = 'cancel', user_id = tonumber(ARGV[1]), at = ARGV[2]}))
+if status == 'waitlist' then
+  redis.call('LREM', KEYS[3], 0, ARGV[1])
+else
+  redis.call('INCR', KEYS[1])
+  promote(ARGV[2])
+end
+return status
+""",
+    # ARGV: capacity delta, now
+    "resize": PROMOTE + """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 'cold' end
+redis.call('INCRBY', KEYS[1], ARGV[1])
+promote(ARGV[2])
+return 'ok'
+""",
+    # ARGV: free seats, JSON [[user_id, status], ...] in registration order, event_id
+    "prime": """
+if redis.call('EXISTS', KEYS[1]) == 1 then return 0 end
+redis.call('DEL', KEYS[2], KEYS[3], KEYS[5])
+for _, member in ipairs(cjson.decode(ARGV[2])) do
+  redis.call('HSET', KEYS[2], member[1], member[2])
+  if member[2] == 'waitlist' then redis.call('RPUSH', KEYS[3], member[1]) end
+end
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('SADD', KEYS[6], ARGV[3])
+return 1
+""",
+    # ARGV: free seats according to the database, now
+    "repair": PROMOTE + """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('LLEN', KEYS[4]) > 0 then return 0 end
+redis.call('SET', KEYS[1], ARGV[1])
+promote(ARGV[2])
+return 1
+""",
+    # ARGV: event_id
+    "retire": """
+if redis.call('LLEN', KEYS[4]) > 0 then return 0 end
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5])
+redis.call('SREM', KEYS[6], ARGV[1])
+return 1
+""",
+}
+
+
+def _load_scripts(client):
+    if client is None:
+        return {}
+    return {name: client.register_script(source) for name, source in SCRIPTS.items()}
+
+
+async_scripts = _load_scripts(redis_client)
+sync_scripts = _load_scripts(sync_redis_client)
+
+
+def hot_keys(event_id: int):
+    prefix = f"event:{event_id}:"
+    return [
+        prefix + "seats",
+        prefix + "members",
+        prefix + "waitlist",
+        prefix + "pending",
+        prefix + "closed",
+        HOT_EVENTS_KEY,
+    ]
+
+
+def _now():
+    return utcnow().isoformat()
+
+
+def _decode(result):
+    return result.decode() if isinstance(result, bytes) else result
+
+
+async def hot_register(event_id: int, user_id: int) -> str:
+    """Returns 'confirmed', 'waitlist', 'duplicate', 'closed' or 'cold' (not primed)."""
+    result = await async_scripts["register"](keys=hot_keys(event_id), args=[user_id, _now()])
+    return _decode(result)
+
+
+async def hot_cancel(event_id: int, user_id: int) -> str:
+    """Returns the cancelled status, 'none' or 'cold' (not primed)."""
+    result = await async_scripts["cancel"](keys=hot_keys(event_id), args=[user_id, _now()])
+    return _decode(result)
+
+
+async def hot_cancel_many(event_id: int, user_ids: list[int]) -> list[str]:
+    """hot_cancel for each of user_ids, in one round trip."""
+    keys, now = hot_keys(event_id), _now()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for user_id in user_ids:
+            await async_scripts["cancel"](keys=keys, args=[user_id, now], client=pipe)
+        return [_decode(result) for result in await pipe.execute()]
+
+
+async def hot_resize(event_id: int, delta: int):
+    await async_scripts["resize"](keys=hot_keys(event_id), args=[delta, _now()])
+
+
+async def hot_close(event_id: int, closed: bool):
+    key = hot_keys(event_id)[4]
+    if closed:
+        await redis_client.set(key, 1)
+    else:
+        await redis_client.delete(key)
+
+
+async def prime_hot_event(db, event_id: int) -> bool:
+    """Loads a hot event's seats, members and waitlist into Redis.
+
+    The event row stays locked while its registrations are read so no SQL
+    seat decision can interleave. Returns False for events that are not
+    active and hot.
+    """
+    event = await db.scalar(select(Event).where(Event.id == event_id).with_for_update())
+    if event is None or not event.hot_mode or not event.is_active:
+        await db.rollback()
+        return False
+
+    rows = await db.execute(select(EventRegistration.user_id, EventRegistration.status).where(
+        EventRegistration.event_id == event_id,
+        EventRegistration.status != Status.cancelled
+    ).order_by(EventRegistration.registered_at, EventRegistration.id))
+    members = [[str(user_id), status.value] for user_id, status in rows]
+
+    await async_scripts["prime"](
+        keys=hot_keys(event_id),
+        args=[event.max_participants - event.confirmed_count, json.dumps(members), event_id],
+    )
+    await db.commit()
+    return True
+
+
+def _apply_entries(db, event_id: int, entries: list[dict]):
+    registrations = EventRegistration.__table__
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+    # consecutive entries of one kind go out as a single executemany
+    for op, group in groupby(entries, key=lambda entry: entry["op"]):
+        group = list(group)
+        if op == "register":
+            db.execute(insert(registrations).on_conflict_do_nothing(
+                index_elements=["event_id", "user_id"],
+                index_where=ACTIVE_REGISTRATION,
+            ), [
+                {
+                    "user_id": entry["user_id"],
+                    "event_id": event_id,
+                    "status": Status(entry["status"]),
+                    "registered_at": datetime.fromisoformat(entry["at"]),
+                }
+                for entry in group
+            ])
+        else:
+            from_status = registrations.c.status != Status.cancelled if op == "cancel" else registrations.c.status == Status.waitlist
+            to_status = Status.cancelled if op == "cancel" else Status.confirmed
+            db.execute(update(registrations).where(
+                registrations.c.event_id == event_id,
+                registrations.c.user_id == bindparam("b_user_id"),
+                from_status,
+            ).values(status=to_status), [{"b_user_id": entry["user_id"]} for entry in group])
+
+
+def _record_hourly(db, event_id: int, entries: list[dict]):
+    buckets = {}
+    for entry in entries:
+        if entry["op"] in ("register", "cancel"):
+            counts = buckets.setdefault(to_hour(datetime.fromisoformat(entry["at"])), [0, 0])
+            counts[entry["op"] == "cancel"] += 1
+
+    for hour, (registrations, cancellations) in buckets.items():
+        db.execute(hourly_update(db.bind.dialect.name, event_id, hour, registrations, cancellations))
+
+
+def reconcile_hot_event(event_id: int, wait: bool = False):
+    """Persists pending decisions, then repairs seat drift or retires the event.
+
+    A run already in progress elsewhere is skipped, or waited for with wait.
+    """
+    client = sync_redis_client
+    keys = hot_keys(event_id)
+
+    lock = client.lock(f"event:{event_id}:reconcile", timeout=60)
+    if not lock.acquire(blocking=wait):
+        return
+
+    try:
+        with SessionLocal() as db:
+            if db.get(Event, event_id) is None:
+                client.delete(*keys[:5])
+                client.srem(HOT_EVENTS_KEY, event_id)
+                return
+
+            while True:
+                raw = client.lrange(keys[3], 0, HOT_EVENT_RECONCILE_BATCH - 1)
+                if raw:
+                    entries = [json.loads(entry) for entry in raw]
+                    _apply_entries(db, event_id, entries)
+                    _record_hourly(db, event_id, entries)
+                    db.commit()
+                    client.ltrim(keys[3], len(raw), -1)
+                if len(raw) < HOT_EVENT_RECONCILE_BATCH:
+                    break
+
+            # pending entries do not say what a cancel released, so counters are recounted
+            rebuild_counters(db, [event_id])
+            db.commit()
+            event = db.get(Event, event_id)
+
+            if event.hot_mode:
+                sync_scripts["repair"](keys=keys, args=[event.max_participants - event.confirmed_count, _now()])
+            else:
+                sync_scripts["retire"](keys=keys, args=[event_id])
+    finally:
+        lock.release()
+
+
+def reconcile_hot_events():
+    for event_id in sync_redis_client.smembers(HOT_EVENTS_KEY):
+        reconcile_hot_event(int(event_id))
@@ -0,0 +1,148 @@
+import logging
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.mime.text import MIMEText
+from queue import Empty, Full, LifoQueue
+
+from app.settings import (
+    EMAIL_ADDRESS,
+    EMAIL_PASSWORD,
+    SMTP_IDLE_CHECK_SECONDS,
+    SMTP_POOL_SIZE,
+    SMTP_PORT,
+    SMTP_RATE_LIMIT,
+    SMTP_SERVER,
+    SMTP_STARTTLS,
+)
+
+logger = logging.getLogger(__name__)
+
+# raised by a dropped or refused session; worth a new connection and a retry
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def build_message(to_email: str, subject: str, body: str):
+    msg = MIMEText(body)
+    msg["Subject"] = subject
+    msg["From"] = EMAIL_ADDRESS
+    msg["To"] = to_email
+    return msg
+
+
+class TokenBucket:
+    """Blocking token bucket, `rate` tokens per second with bursts up to `rate`."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class SMTPPool:
+    """Keeps logged-in SMTP sessions open between tasks of a worker process."""
+
+    def __init__(self, host, port, size: int = 2, rate_limit: float = 0):
+        self.host = host
+        self.port = int(port) if port else 0
+        self._idle = LifoQueue(maxsize=size)
+        self._bucket = TokenBucket(rate_limit) if rate_limit else None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if SMTP_STARTTLS:
+            server.starttls()
+        if EMAIL_PASSWORD:
+            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+        return server
+
+    def _checkout(self):
+        try:
+            server, idle_since = self._idle.get_nowait()
+        except Empty:
+            return self._connect()
+
+        if time.monotonic() - idle_since < SMTP_IDLE_CHECK_SECONDS:
+            return server
+        try:
+            if server.noop()[0] == 250:
+                return server
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._close(server)
+        return self._connect()
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    @contextmanager
+    def connection(self):
+        server = self._checkout()
+        try:
+            yield server
+        except BaseException:
+            # the session state is unknown after a failure
+            self._close(server)
+            raise
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except Full:
+            self._close(server)
+
+    def send(self, messages) -> int:
+        """Sends messages over pooled sessions, reconnecting when one drops.
+
+        Refused recipients are logged and skipped. Returns the number of
+        messages handled; on a failure that persists after reconnecting, the
+        error is re-raised with that number stored as `sent` so callers can
+        retry only the remainder.
+        """
+        sent = 0
+        failed_at = None
+        while sent < len(messages):
+            try:
+                with self.connection() as server:
+                    for msg in messages[sent:]:
+                        if self._bucket:
+                            self._bucket.take()
+                        try:
+                            server.send_message(msg)
+                        except smtplib.SMTPRecipientsRefused:
+                            logger.warning("SMTP refused recipient %s", msg["To"])
+                        sent += 1
+            except TRANSIENT_ERRORS as err:
+                # reconnect, unless the fresh session failed on the same message
+                if failed_at == sent:
+                    err.sent = sent
+                    raise
+                failed_at = sent
+            except (smtplib.SMTPException, OSError) as err:
+                err.sent = sent
+                raise
+        return sent
+
+    def close_all(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except Empty:
+                return
+            self._close(server)
+
+
+smtp_pool = SMTPPool(SMTP_SERVER, SMTP_PORT, size=SMTP_POOL_SIZE, rate_limit=SMTP_RATE_LIMIT)
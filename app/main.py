@@ -1,8 +1,22 @@
 from fastapi import FastAPI
-from app.middlewares import origins
+from fastapi.responses import Response
+from app.database import async_engine, engine, replicas
+from app.metrics import instrument_engine, render_metrics
+from app.profiler import install_profiler
+from app.middlewares import (
+    MemoryRateLimitBackend,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    RedisRateLimitBackend,
+    load_rate_limit_rules,
+    origins,
+)
+from app.redis_client import redis_client
+from app.settings import METRICS_ENABLED, RATE_LIMIT_BACKEND, RATE_LIMIT_ENABLED
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.auth import router as auth_router
 from app.routers.events import router as events_router
+from app.routers.admin import router as admin_router
 
 app = FastAPI(
     title="Event Management System",
@@ -11,6 +25,14 @@ app = FastAPI(
 )
 
 
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=RedisRateLimitBackend(redis_client) if RATE_LIMIT_BACKEND == "redis" else MemoryRateLimitBackend(),
+        rules=load_rate_limit_rules(),
+    )
+
+# added after the rate limiter so it wraps it: 429s carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -19,10 +41,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_profiler(engine)
+if async_engine is not None:
+    install_profiler(async_engine.sync_engine)
+for replica in replicas:
+    install_profiler(replica.sync_engine)
+
+if METRICS_ENABLED:
+    instrument_engine(engine, "sync")
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine, "async")
+    for index, replica in enumerate(replicas):
+        instrument_engine(replica.sync_engine, f"replica{index}")
+    # added last so it is outermost and also times rejected requests
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Event Management System API!"}
 
 app.include_router(auth_router)
-app.include_router(events_router)
\ No newline at end of file
+app.include_router(events_router)
+app.include_router(admin_router)
\ No newline at end of file
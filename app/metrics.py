@@ -0,0 +1,105 @@
+"""Prometheus metrics for requests, SQL and the connection pool.
+
+Each worker records into its own prometheus_client metrics. With several
+uvicorn/gunicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty directory
+shared by them; every worker then writes to its own mmap files and /metrics
+aggregates them at scrape time, so recording never contends across workers.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+from app.settings import METRICS_QUERY_WARN_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route.",
+    ["method", "route", "status"],
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.",
+    ["method", "route"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries", "SQL statements executed per request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+N_PLUS_ONE = Counter(
+    "http_request_query_threshold_exceeded_total",
+    "Requests that executed more than METRICS_QUERY_WARN_THRESHOLD statements.",
+    ["method", "route"],
+)
+POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use", "Connections currently checked out of the pool.",
+    ["engine"], multiprocess_mode="livesum",
+)
+POOL_OPENED = Counter(
+    "db_pool_connections_opened_total", "New DBAPI connections opened by the pool.",
+    ["engine"],
+)
+
+# [query count, seconds in SQL] of the request being served; a mutable list
+# so the threadpool copies of the context made in DB_MODE=sync share it
+request_stats: ContextVar[list | None] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, a statement that fails takes its start time with it
+    if context is not None:
+        context.metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = request_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+def instrument_engine(engine, name: str):
+    """Hooks query timing and pool usage onto a sync Engine (async_engine.sync_engine for async)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    in_use = POOL_IN_USE.labels(name)
+    event.listen(engine.pool, "checkout", lambda *args: in_use.inc())
+    event.listen(engine.pool, "checkin", lambda *args: in_use.dec())
+    opened = POOL_OPENED.labels(name)
+    event.listen(engine.pool, "connect", lambda *args: opened.inc())
+
+
+def start_request():
+    stats = [0, 0.0]
+    return stats, request_stats.set(stats)
+
+
+def finish_request(token, stats, method: str, route: str, status: int, elapsed: float):
+    request_stats.reset(token)
+    REQUEST_LATENCY.labels(method, route, status).observe(elapsed)
+    queries, db_time = stats
+    REQUEST_QUERIES.labels(method, route).observe(queries)
+    REQUEST_DB_TIME.labels(method, route).observe(db_time)
+    if queries > METRICS_QUERY_WARN_THRESHOLD:
+        N_PLUS_ONE.labels(method, route).inc()
+        logger.warning("%s %s ran %d SQL statements, possible N+1", method, route, queries)
+
+
+def render_metrics():
+    """Returns (body, content type) for every worker when multiprocess mode is on."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
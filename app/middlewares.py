@@ -1,3 +1,190 @@
+import json
+import math
+import re
+import time
+from collections import OrderedDict
+
+from app.metrics import finish_request, start_request
+from app.settings import RATE_LIMIT_RULES, RATE_LIMIT_TRUST_FORWARDED
+
 origins = [
     "http://localhost:3000",
-]
\ No newline at end of file
+]
+
+DEFAULT_RATE_LIMIT_RULES = [
+    # Argon2 makes every login attempt expensive
+    {"method": "POST", "path": "/auth/login/", "rate": 0.2, "burst": 10, "key": "ip"},
+    {"method": "POST", "path": "/auth/register/", "rate": 0.1, "burst": 5, "key": "ip"},
+    {"method": "POST", "path": "/events/{event_id}/register", "rate": 0.5, "burst": 10, "key": "user"},
+]
+
+
+class RateLimitRule:
+    def __init__(self, method: str, path: str, rate: float, burst: int, key: str = "ip"):
+        self.method = method
+        self.path = path
+        self.pattern = re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", path) + "$")
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+
+
+def load_rate_limit_rules():
+    rules = json.loads(RATE_LIMIT_RULES) if RATE_LIMIT_RULES else DEFAULT_RATE_LIMIT_RULES
+    return [RateLimitRule(**rule) for rule in rules]
+
+
+class MemoryRateLimitBackend:
+    """Per-process token buckets, least recently used ones are dropped past max_keys."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int):
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed, tokens
+
+
+TOKEN_BUCKET_LUA = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by every node, updated atomically by one Lua script."""
+
+    def __init__(self, client):
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
+
+    async def take(self, key: str, rate: float, burst: int):
+        allowed, tokens = await self._script(keys=[f"ratelimit:{key}"], args=[rate, burst])
+        return bool(allowed), float(tokens)
+
+
+class RateLimitMiddleware:
+    """ASGI token-bucket limiter for the configured routes.
+
+    Buckets are keyed by rule and client IP, or by bearer token for "user"
+    rules (unauthenticated calls fall back to the IP). Limited responses carry
+    RateLimit-Limit/Remaining/Reset headers, rejections are 429 with Retry-After.
+    """
+
+    def __init__(self, app, backend, rules):
+        self.app = app
+        self.backend = backend
+        self.rules = rules
+
+    def _match(self, scope):
+        for index, rule in enumerate(self.rules):
+            if rule.method == scope["method"] and rule.pattern.match(scope["path"]):
+                return index, rule
+        return None, None
+
+    def _client_key(self, scope, rule):
+        headers = dict(scope["headers"])
+        if rule.key == "user":
+            authorization = headers.get(b"authorization", b"")
+            if authorization.startswith(b"Bearer "):
+                # the signature segment is unique per token; forged tokens are rejected later
+                return "u:" + authorization.rsplit(b".", 1)[-1][-43:].decode("latin-1")
+
+        if RATE_LIMIT_TRUST_FORWARDED and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].split(b",")[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        index, rule = self._match(scope)
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        allowed, tokens = await self.backend.take(f"{index}:{self._client_key(scope, rule)}", rule.rate, rule.burst)
+        reset = math.ceil((rule.burst - tokens) / rule.rate)
+        headers = [
+            (b"ratelimit-limit", str(rule.burst).encode()),
+            (b"ratelimit-remaining", str(int(tokens)).encode()),
+            (b"ratelimit-reset", str(reset).encode()),
+        ]
+
+        if not allowed:
+            retry_after = math.ceil((1 - tokens) / rule.rate)
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"content-type", b"application/json"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Too many requests"}'})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class MetricsMiddleware:
+    """Records latency, SQL statement count and SQL time of every HTTP request.
+
+    Requests are labelled with the matched route template, unmatched paths
+    share one label so the series count stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        started = time.perf_counter()
+        stats, token = start_request()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            finish_request(
+                token, stats, scope["method"], route.path if route else "unmatched",
+                status_code, time.perf_counter() - started,
+            )
@@ -1,3 +1,8 @@
-from app.models.models import User, Event, EventRegistration
+from app.models.models import (
+    User, Event, EventRegistration, ArchivedEventRegistration, EventStats, EventHourlyStats, NotificationFanout, OutboxMessage
+)
 
-__all__ = ["User", "Event", "EventRegistration"]
\ No newline at end of file
+__all__ = [
+    "User", "Event", "EventRegistration", "ArchivedEventRegistration", "EventStats", "EventHourlyStats",
+    "NotificationFanout", "OutboxMessage",
+]
@@ -4,7 +4,7 @@ from datetime import datetime, UTC
 from enum import Enum as PyEnum
 
 from sqlalchemy import (
-    String, Integer, DateTime, Boolean, ForeignKey, Enum
+    String, Integer, DateTime, Boolean, ForeignKey, Enum, Index, JSON, false, func, text
 )
 from sqlalchemy.orm import (
     relationship, Mapped, mapped_column, declarative_base
@@ -13,6 +13,11 @@ from sqlalchemy.orm import (
 from app.database import Base
 
 
+def utcnow() -> datetime:
+    """Current time as naive UTC, the form every DateTime column stores."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
 class RegistrationStatus(PyEnum):
     confirmed = "confirmed"
     cancelled = "cancelled"
@@ -24,55 +29,183 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(50), unique=True)
-    email: Mapped[str] = mapped_column(String(100), unique=True)
+    email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
     hashed_password: Mapped[str] = mapped_column(String(128))
     is_active: Mapped[bool] = mapped_column(default=True)
     is_verified: Mapped[bool] = mapped_column(default=False)
     is_admin: Mapped[bool] = mapped_column(default=False)
-    created_at: Mapped[datetime] = mapped_column(default=datetime.now(UTC))
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
 
+    # no implicit loads: listings must say how they load related rows, see "me" routes
     events: Mapped[list["Event"]] = relationship(
-        back_populates="organizer"
+        back_populates="organizer", lazy="raise_on_sql"
     )
 
     registrations: Mapped[list["EventRegistration"]] = relationship(
-        back_populates="user"
+        back_populates="user", lazy="raise_on_sql"
     )
 
 
 
 class Event(Base):
     __tablename__ = 'events'
+    __table_args__ = (
+        # keyset pagination on (start_datetime, id) for the event listing
+        Index("ix_events_start_datetime_id", "start_datetime", "id"),
+        Index(
+            "ix_events_active_start_datetime_id", "start_datetime", "id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        Index("ix_events_organizer_id_start_datetime_id", "organizer_id", "start_datetime", "id"),
+        # "overlaps [from, to)" calendar queries, see app.calendar.overlapping
+        Index(
+            "ix_events_period",
+            text("tsrange(start_datetime, greatest(start_datetime, end_datetime), '[]')"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_events_end_datetime_start_datetime", "end_datetime", "start_datetime").ddl_if(dialect="sqlite"),
+        # events still holding registrations in the live table, see app.archive
+        Index(
+            "ix_events_unarchived_end_datetime", "end_datetime",
+            postgresql_where=text("archived_at IS NULL"),
+            sqlite_where=text("archived_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(100))
     description: Mapped[str] = mapped_column(String(500), nullable=True)
-    start_datetime: Mapped[datetime] = mapped_column(default=datetime.now(UTC))
-    end_datetime: Mapped[datetime] = mapped_column(default=datetime.now(UTC))
+    start_datetime: Mapped[datetime] = mapped_column(default=utcnow)
+    end_datetime: Mapped[datetime] = mapped_column(default=utcnow)
     location: Mapped[str] = mapped_column(String(200), nullable=True)
     max_participants: Mapped[int] = mapped_column(default=100)
+    # kept in step with confirmed registrations so seats are decided in one UPDATE
+    confirmed_count: Mapped[int] = mapped_column(default=0, server_default="0")
     is_active: Mapped[bool] = mapped_column(default=True)
-    created_at: Mapped[datetime] = mapped_column(default=datetime.now(UTC))
+    # seats are taken from Redis while set, see app.hot_events
+    hot_mode: Mapped[bool] = mapped_column(default=False, server_default=false())
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
+    # bumped by event edits only, it versions the calendar feeds
+    updated_at: Mapped[datetime] = mapped_column(default=utcnow, server_default=func.now())
+    # soft delete: the row stays so registrations and rollups keep their foreign keys
+    deleted_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    # set once every registration has moved to event_registrations_archive
+    archived_at: Mapped[datetime | None] = mapped_column(nullable=True)
 
     organizer_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    organizer: Mapped["User"] = relationship(back_populates="events")
+    organizer: Mapped["User"] = relationship(back_populates="events", lazy="raise_on_sql")
 
     registrations: Mapped[list["EventRegistration"]] = relationship(
-        back_populates="event"
+        back_populates="event", lazy="raise_on_sql"
     )
 
 
 
 class EventRegistration(Base):
     __tablename__ = 'event_registrations'
+    __table_args__ = (
+        # at most one active registration per user and event
+        Index(
+            "uq_event_registrations_event_id_user_id_active", "event_id", "user_id",
+            unique=True,
+            postgresql_where=text("status != 'cancelled'"),
+            sqlite_where=text("status != 'cancelled'"),
+        ),
+        # confirmed counts and participant listings filtered by status
+        Index("ix_event_registrations_event_id_status", "event_id", "status"),
+        # oldest-first waitlist promotion
+        Index(
+            "ix_event_registrations_waitlist", "event_id", "registered_at", "id",
+            postgresql_where=text("status = 'waitlist'"),
+            sqlite_where=text("status = 'waitlist'"),
+        ),
+        Index("ix_event_registrations_user_id_status", "user_id", "status"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id"))
-    registered_at: Mapped[datetime] = mapped_column(default=datetime.now(UTC))
+    registered_at: Mapped[datetime] = mapped_column(default=utcnow)
     status: Mapped[RegistrationStatus] = mapped_column(
         Enum(RegistrationStatus), default=RegistrationStatus.waitlist
     )
 
-    user: Mapped["User"] = relationship(back_populates="registrations")
-    event: Mapped["Event"] = relationship(back_populates="registrations")
+    user: Mapped["User"] = relationship(back_populates="registrations", lazy="raise_on_sql")
+    event: Mapped["Event"] = relationship(back_populates="registrations", lazy="raise_on_sql")
+
+
+
+class ArchivedEventRegistration(Base):
+    """Registration of a finished or deleted event, moved out of the hot table by app.archive."""
+
+    __tablename__ = 'event_registrations_archive'
+    __table_args__ = (
+        Index("ix_event_registrations_archive_event_id", "event_id"),
+        Index("ix_event_registrations_archive_user_id", "user_id"),
+    )
+
+    # ids are kept from event_registrations; no foreign keys so cold rows never block writes
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(Integer)
+    event_id: Mapped[int] = mapped_column(Integer)
+    registered_at: Mapped[datetime]
+    status: Mapped[RegistrationStatus] = mapped_column(Enum(RegistrationStatus))
+    # set by app.archive from the app clock; the server default only covers other writers
+    archived_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
+
+class NotificationFanout(Base):
+    """One notification sent to every active registrant of an event, with resumable progress."""
+
+    __tablename__ = 'notification_fanouts'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # no foreign key: a fan-out for a deleted event outlives the event row
+    event_id: Mapped[int] = mapped_column(Integer, index=True)
+    kind: Mapped[str] = mapped_column(String(20))
+    subject: Mapped[str] = mapped_column(String(200))
+    body: Mapped[str] = mapped_column(String(2000))
+    # registrations are streamed in id order; everything up to here has been dispatched
+    last_registration_id: Mapped[int] = mapped_column(default=0)
+    dispatched: Mapped[int] = mapped_column(default=0)
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(default=utcnow)
+
+
+
+class OutboxMessage(Base):
+    """A Celery task call committed with the data it belongs to, published by app.outbox."""
+
+    __tablename__ = 'outbox_messages'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task: Mapped[str] = mapped_column(String(200))
+    kwargs: Mapped[dict] = mapped_column(JSON, default=dict)
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
+
+
+
+class EventStats(Base):
+    """Registration counters of an event, kept in step by app.stats (confirmed lives on Event)."""
+
+    __tablename__ = 'event_stats'
+
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id"), primary_key=True)
+    registered: Mapped[int] = mapped_column(default=0, server_default="0")
+    waitlist: Mapped[int] = mapped_column(default=0, server_default="0")
+    cancelled: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+
+class EventHourlyStats(Base):
+    """Registrations and cancellations of an event per UTC hour."""
+
+    __tablename__ = 'event_hourly_stats'
+
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id"), primary_key=True)
+    hour: Mapped[datetime] = mapped_column(primary_key=True)
+    registrations: Mapped[int] = mapped_column(default=0, server_default="0")
+    cancellations: Mapped[int] = mapped_column(default=0, server_default="0")
@@ -0,0 +1,64 @@
+"""Transactional outbox for Celery tasks.
+
+Request handlers `enqueue` task calls into the session they are already
+committing, so the broker is never on the request path and a message exists
+exactly when its data does. The relay publishes committed messages:
+
+    python -m app.outbox
+"""
+import logging
+import time
+
+from sqlalchemy import delete, select
+
+from app.database import SessionLocal
+from app.models import OutboxMessage
+from app.settings import OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL
+from app.tasks import clry
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(db, task, **kwargs):
+    """Adds a call of `task` to the caller's transaction; published after commit."""
+    db.add(OutboxMessage(task=task.name, kwargs=kwargs))
+
+
+def relay_once(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Publishes one batch of outbox messages, returns how many were sent.
+
+    Rows stay locked (SKIP LOCKED lets several relays share the table) until
+    they are deleted in the same transaction. A crash after publishing
+    re-sends the batch, so delivery is at-least-once.
+    """
+    with SessionLocal() as db:
+        messages = db.scalars(
+            select(OutboxMessage).order_by(OutboxMessage.id).limit(batch_size).with_for_update(skip_locked=True)
+        ).all()
+        if not messages:
+            return 0
+
+        with clry.producer_or_acquire() as producer:
+            for message in messages:
+                clry.send_task(message.task, kwargs=message.kwargs, producer=producer)
+
+        db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_([message.id for message in messages])))
+        db.commit()
+        return len(messages)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Outbox relay started")
+    while True:
+        try:
+            sent = relay_once()
+        except Exception:
+            logger.exception("Outbox relay failed, retrying")
+            sent = 0
+        if sent < OUTBOX_BATCH_SIZE:
+            time.sleep(OUTBOX_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
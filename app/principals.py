@@ -0,0 +1,83 @@
+import logging
+
+from redis.exceptions import RedisError
+
+from app.cache import LRUCache
+from app.redis_client import redis_client
+from app.schemas.schemas import Principal
+from app.settings import PRINCIPAL_CACHE_BACKEND, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+principal_cache = LRUCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def _shared_tier():
+    return redis_client if PRINCIPAL_CACHE_BACKEND == "redis" else None
+
+
+def _redis_key(email: str):
+    return f"principal:{email}"
+
+
+async def get_principal(email: str) -> Principal | None:
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    shared = _shared_tier()
+    if shared is None:
+        return None
+
+    try:
+        raw = await shared.get(_redis_key(email))
+    except RedisError:
+        logger.warning("Principal cache: redis unavailable", exc_info=True)
+        redis_stats["errors"] += 1
+        return None
+
+    if raw is None:
+        redis_stats["misses"] += 1
+        return None
+
+    redis_stats["hits"] += 1
+    principal = Principal.model_validate_json(raw)
+    principal_cache.set(email, principal)
+    return principal
+
+
+async def set_principal(principal: Principal):
+    principal_cache.set(principal.email, principal)
+
+    shared = _shared_tier()
+    if shared is None:
+        return
+
+    try:
+        await shared.set(_redis_key(principal.email), principal.model_dump_json(), ex=PRINCIPAL_CACHE_TTL)
+    except RedisError:
+        logger.warning("Principal cache: redis unavailable", exc_info=True)
+        redis_stats["errors"] += 1
+
+
+async def invalidate_principal(email: str):
+    """Drop a cached principal after its active/verified/admin flags change.
+
+    Other workers only hold the entry in their local tier for PRINCIPAL_CACHE_TTL.
+    """
+    principal_cache.delete(email)
+
+    shared = _shared_tier()
+    if shared is None:
+        return
+
+    try:
+        await shared.delete(_redis_key(email))
+    except RedisError:
+        logger.warning("Principal cache: redis unavailable", exc_info=True)
+        redis_stats["errors"] += 1
+
+
+def principal_cache_stats():
+    return {"local": principal_cache.stats(), "redis": dict(redis_stats)}
@@ -0,0 +1,185 @@
+"""Slow-query profiler for the SQLAlchemy engines.
+
+Statements slower than SLOW_QUERY_MS are logged once, normalised and
+fingerprinted, and aggregated in memory per worker. A sample of them is
+queued for EXPLAIN, which a background thread runs on its own unpooled
+connection: the slow request never waits for a plan or for a pool slot,
+and a failing EXPLAIN can never abort the caller's transaction.
+"""
+import hashlib
+import logging
+import queue
+import random
+import re
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+
+from app.settings import SLOW_QUERY_EXPLAIN_RATE, SLOW_QUERY_MS, SLOW_QUERY_TOP_N
+
+logger = logging.getLogger("app.sql.slow")
+
+NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|\$\d+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    # IN lists and VALUES rows of any length share a fingerprint
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(...)"),
+    (re.compile(r"(?:\(\.\.\.\)\s*,\s*)+\(\.\.\.\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+EXPLAINABLE = ("select", "with", "update", "delete", "insert")
+
+# plans are captured with the sync driver of the same database
+SYNC_DRIVERS = {"postgresql+asyncpg": "postgresql+psycopg2", "sqlite+aiosqlite": "sqlite"}
+DOLLAR_PARAM = re.compile(r"\$(\d+)")
+PLAN_PENDING = "(pending)"
+
+_stats: dict[str, dict] = {}
+# only slow statements take it, the fast path never does
+_lock = threading.Lock()
+# profiled engine -> unpooled engine its EXPLAINs run on
+_explain_engines = {}
+# sampled statements waiting for a plan; dropped rather than queued without bound
+_plans: queue.Queue = queue.Queue(maxsize=100)
+_plan_worker: threading.Thread | None = None
+
+
+def normalize(statement: str) -> str:
+    for pattern, replacement in NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def _to_pyformat(statement: str, parameters):
+    """asyncpg's $n placeholders as psycopg2 %s ones, parameters in placeholder order."""
+    ordered = []
+
+    def placeholder(match):
+        ordered.append(parameters[int(match.group(1)) - 1])
+        return "%s"
+
+    return DOLLAR_PARAM.sub(placeholder, statement.replace("%", "%%")), tuple(ordered)
+
+
+def _explain(engine, driver, statement, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    if driver == "asyncpg":
+        statement, parameters = _to_pyformat(statement, parameters)
+    try:
+        with engine.connect() as explain_conn:
+            rows = explain_conn.exec_driver_sql(prefix + statement, parameters).all()
+        return "\n".join(" ".join(str(value) for value in row) for row in rows)
+    except Exception:
+        logger.debug("EXPLAIN failed", exc_info=True)
+        return None
+
+
+def _capture_plans():
+    while True:
+        key, engine, driver, statement, parameters = _plans.get()
+        plan = _explain(engine, driver, statement, parameters)
+        with _lock:
+            # a failed capture is left to a later sample
+            if key in _stats:
+                _stats[key]["plan"] = plan
+
+
+def _queue_plan(key, conn, statement, parameters) -> bool:
+    """Hands a statement to the plan thread, False when it is behind. Called under _lock."""
+    global _plan_worker
+    if _plan_worker is None or not _plan_worker.is_alive():
+        # started lazily, so forked workers get their own thread
+        _plan_worker = threading.Thread(target=_capture_plans, name="slow-query-explain", daemon=True)
+        _plan_worker.start()
+    try:
+        _plans.put_nowait((key, _explain_engines[conn.engine], conn.dialect.driver, statement, parameters))
+    except queue.Full:
+        return False
+    return True
+
+
+def _record(conn, statement, parameters, executemany, elapsed):
+    normalized = normalize(statement)
+    key = fingerprint(normalized)
+    logger.warning("slow query %.1fms [%s] %s", elapsed * 1000, key, normalized)
+
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                "fingerprint": key,
+                "statement": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_seen": 0.0,
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed * 1000
+        entry["max_ms"] = max(entry["max_ms"], elapsed * 1000)
+        entry["last_seen"] = time.time()
+
+        # keep headroom over top N so new offenders can climb before eviction
+        if len(_stats) > SLOW_QUERY_TOP_N * 4:
+            for stale in sorted(_stats, key=lambda k: _stats[k]["total_ms"])[:len(_stats) - SLOW_QUERY_TOP_N * 2]:
+                if stale != key:
+                    del _stats[stale]
+
+        if (
+            entry["plan"] is None
+            and not executemany
+            and conn.engine in _explain_engines
+            and statement.lstrip().lower().startswith(EXPLAINABLE)
+            and random.random() < SLOW_QUERY_EXPLAIN_RATE
+            and _queue_plan(key, conn, statement, parameters)
+        ):
+            entry["plan"] = PLAN_PENDING
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # on the execution context, like app.metrics, so failed statements leave nothing behind
+    if context is not None:
+        context.profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "profiler_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        _record(conn, statement, parameters, executemany, elapsed)
+
+
+def install_profiler(engine):
+    """Hooks the profiler onto a sync Engine (async_engine.sync_engine for async)."""
+    if SLOW_QUERY_MS <= 0:
+        return
+    if SLOW_QUERY_EXPLAIN_RATE > 0:
+        url = engine.url.set(drivername=SYNC_DRIVERS.get(engine.url.drivername, engine.url.drivername))
+        _explain_engines[engine] = create_engine(url, poolclass=NullPool)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def slow_queries(order_by: str = "total_ms", limit: int = SLOW_QUERY_TOP_N) -> list[dict]:
+    with _lock:
+        entries = [dict(entry) for entry in _stats.values()]
+    entries.sort(key=lambda entry: entry[order_by], reverse=True)
+    for entry in entries:
+        entry["mean_ms"] = entry["total_ms"] / entry["count"]
+    return entries[:limit]
+
+
+def reset_slow_queries():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,10 @@
+import redis
+from redis import asyncio as aioredis
+
+from app.settings import REDIS_URL
+
+# connections are opened lazily on first command
+redis_client = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+
+# for Celery workers and other sync callers
+sync_redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
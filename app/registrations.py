@@ -0,0 +1,262 @@
+from sqlalchemy import Integer, String, any_, case, cast, exists, literal, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models import Event, EventRegistration, User
+from app.models.models import RegistrationStatus as Status, utcnow
+from app.stats import bump_stats
+
+REGISTRATION_COLUMNS = ["user_id", "event_id", "registered_at", "status"]
+
+# stays below SQLite's bound parameter limit
+IN_CHUNK_SIZE = 10000
+
+# the partial unique index's predicate, inlined: Postgres cannot match ON CONFLICT
+# to the index when the status comes in as a bound parameter (asyncpg's $n)
+ACTIVE_REGISTRATION = text("status != 'cancelled'")
+
+
+def _take_seat(event_id: int):
+    # the row lock taken by this UPDATE serialises concurrent seat decisions;
+    # Postgres re-checks the WHERE against the latest row version after the wait
+    return update(Event).where(
+        Event.id == event_id,
+        Event.is_active == True,
+        Event.hot_mode == False,
+        Event.archived_at.is_(None),
+        Event.confirmed_count < Event.max_participants,
+    ).values(
+        confirmed_count=Event.confirmed_count + 1
+    ).returning(Event.id)
+
+
+def _insert_registration(dialect: str, rows):
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    return insert(EventRegistration).from_select(REGISTRATION_COLUMNS, rows).on_conflict_do_nothing(
+        index_elements=["event_id", "user_id"],
+        index_where=ACTIVE_REGISTRATION,
+    ).returning(EventRegistration.id, EventRegistration.status)
+
+
+async def register_user_for_event(db, event_id: int, user_id: int):
+    """Atomically takes a seat (or a waitlist spot) and inserts the registration.
+
+    Returns (registration_id, status), or None when the event is missing/inactive,
+    is in hot mode, or the user already holds an active registration. In that
+    case the transaction is rolled back so a taken seat is released.
+    """
+    dialect = db.bind.dialect.name
+
+    if dialect == "postgresql":
+        seat = _take_seat(event_id).cte("seat")
+        status_value = case(
+            (exists(select(seat.c.id)), Status.confirmed.name),
+            else_=Status.waitlist.name,
+        )
+    else:
+        # SQLite has no data-modifying CTEs; its single writer lock keeps
+        # the two statements race-free inside one transaction
+        seat = None
+        got_seat = (await db.execute(_take_seat(event_id))).first() is not None
+        status_value = literal(Status.confirmed.name if got_seat else Status.waitlist.name, String)
+
+    rows = select(
+        # the app's clock like every other writer, not the server's local transaction start
+        literal(user_id), Event.id, literal(utcnow()), cast(status_value, EventRegistration.status.type)
+    ).where(Event.id == event_id, Event.is_active == True, Event.hot_mode == False, Event.archived_at.is_(None))
+
+    stmt = _insert_registration(dialect, rows)
+    if seat is not None:
+        stmt = stmt.add_cte(seat)
+
+    registration = (await db.execute(stmt)).first()
+    if registration is None:
+        await db.rollback()
+        return None
+
+    await bump_stats(db, event_id, registered=1, waitlist=int(registration.status == Status.waitlist))
+    await db.commit()
+    return registration.id, registration.status
+
+
+async def promote_waitlist(db, event_id: int) -> list[int]:
+    """Confirms the oldest waitlisted registrations for every free seat of an event.
+
+    Runs in the caller's transaction with a fixed number of statements however
+    many rows move; the event row lock keeps concurrent promotions from
+    overfilling. Returns the promoted user ids.
+    """
+    free_seats = await db.scalar(select(Event.max_participants - Event.confirmed_count).where(
+        Event.id == event_id,
+        Event.hot_mode == False,
+    ).with_for_update())
+    if not free_seats or free_seats <= 0:
+        return []
+
+    oldest = select(EventRegistration.id).where(
+        EventRegistration.event_id == event_id,
+        EventRegistration.status == Status.waitlist,
+    ).order_by(EventRegistration.registered_at, EventRegistration.id).limit(free_seats)
+
+    promoted = (await db.execute(
+        update(EventRegistration).where(EventRegistration.id.in_(oldest.scalar_subquery())).values(
+            status=Status.confirmed
+        ).returning(EventRegistration.user_id).execution_options(synchronize_session=False)
+    )).scalars().all()
+
+    if promoted:
+        await db.execute(update(Event).where(Event.id == event_id).values(
+            confirmed_count=Event.confirmed_count + len(promoted)
+        ))
+        await bump_stats(db, event_id, waitlist=-len(promoted))
+    return list(promoted)
+
+
+async def cancel_registrations(db, event_id: int, user_ids: list[int]) -> int:
+    """Cancels the active registrations of user_ids, releasing their seats.
+
+    Returns the number of registrations cancelled. Freed seats are not
+    refilled here, follow up with promote_waitlist. Callers bound user_ids
+    below IN_CHUNK_SIZE, SQLite gets them as one IN list.
+    """
+    def cancel(from_status):
+        return update(EventRegistration).where(
+            EventRegistration.event_id == event_id,
+            _in_values(db.bind.dialect.name, EventRegistration.user_id, user_ids, Integer),
+            EventRegistration.status == from_status,
+        ).values(status=Status.cancelled).returning(EventRegistration.id).execution_options(synchronize_session=False)
+
+    confirmed = (await db.execute(cancel(Status.confirmed))).scalars().all()
+    waitlisted = (await db.execute(cancel(Status.waitlist))).scalars().all()
+
+    if confirmed:
+        await db.execute(update(Event).where(Event.id == event_id).values(
+            confirmed_count=Event.confirmed_count - len(confirmed)
+        ))
+    if confirmed or waitlisted:
+        await bump_stats(db, event_id, waitlist=-len(waitlisted), cancelled=len(confirmed) + len(waitlisted))
+    return len(confirmed) + len(waitlisted)
+
+
+def _in_values(dialect: str, column, values, item_type):
+    """column IN values; a single array parameter on Postgres however many there are."""
+    if dialect == "postgresql":
+        return column == any_(literal(list(values), ARRAY(item_type)))
+    return column.in_(values)
+
+
+async def _fetch_matching(db, query, column, values, item_type):
+    """Runs query restricted to column IN values.
+
+    Postgres gets the values as a single array parameter, so any number of
+    them is one statement; other databases are queried in chunks.
+    """
+    values = list(values)
+    if not values:
+        return []
+
+    if db.bind.dialect.name == "postgresql":
+        return (await db.execute(query.where(_in_values("postgresql", column, values, item_type)))).all()
+
+    rows = []
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        rows += (await db.execute(query.where(column.in_(values[start:start + IN_CHUNK_SIZE])))).all()
+    return rows
+
+
+async def import_registrations(db, event_id: int, users: list[int | str]) -> list[dict] | None:
+    """Registers users (ids or emails) for an event in one transaction.
+
+    Seats go to the first rows in request order and the rest are waitlisted.
+    Returns one {"user", "result"} entry per input row, where result is
+    "confirmed", "waitlist", "not_found", "already_registered" or "duplicate";
+    None when the event is missing, inactive, archived or in hot mode once locked.
+    """
+    # populate_existing: the caller may hold a stale copy, seats are counted from the locked row
+    event = await db.scalar(select(Event).where(
+        Event.id == event_id,
+        Event.is_active == True,
+        Event.hot_mode == False,
+        Event.archived_at.is_(None),
+    ).with_for_update().execution_options(populate_existing=True))
+    if event is None:
+        await db.rollback()
+        return None
+
+    ids = {user for user in users if isinstance(user, int)}
+    emails = {user for user in users if isinstance(user, str)}
+    by_id = dict(await _fetch_matching(db, select(User.id, User.id), User.id, ids, Integer))
+    by_email = dict(await _fetch_matching(db, select(User.email, User.id), User.email, emails, String))
+
+    resolved = {user: (by_email if isinstance(user, str) else by_id).get(user) for user in users}
+    registered = {
+        user_id for user_id, in await _fetch_matching(
+            db,
+            select(EventRegistration.user_id).where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status != Status.cancelled,
+            ),
+            EventRegistration.user_id,
+            {user_id for user_id in resolved.values() if user_id is not None},
+            Integer,
+        )
+    }
+
+    free_seats = event.max_participants - event.confirmed_count
+    registered_at = utcnow()
+    results, rows, seen = [], [], set()
+
+    for user in users:
+        user_id = resolved[user]
+        if user_id is None:
+            result = "not_found"
+        elif user_id in registered:
+            result = "already_registered"
+        elif user_id in seen:
+            result = "duplicate"
+        else:
+            seen.add(user_id)
+            status_value = Status.confirmed if free_seats > 0 else Status.waitlist
+            if status_value == Status.confirmed:
+                free_seats -= 1
+            rows.append({
+                "user_id": user_id,
+                "event_id": event_id,
+                "registered_at": registered_at,
+                "status": status_value,
+            })
+            result = status_value.value
+        results.append({"user": user, "result": result})
+
+    inserted = set()
+    if rows:
+        registrations = EventRegistration.__table__
+        insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        # executemany; rows ids follow request order, which keeps the waitlist order
+        inserted = {
+            (user_id, status_value) for user_id, status_value in (await db.execute(
+                insert(registrations).on_conflict_do_nothing(
+                    index_elements=["event_id", "user_id"],
+                    index_where=ACTIVE_REGISTRATION,
+                ).returning(registrations.c.user_id, registrations.c.status),
+                rows,
+            )).all()
+        }
+
+    # rows that lost a race to a concurrent registration were not inserted
+    inserted_ids = {user_id for user_id, _ in inserted}
+    for entry in results:
+        if entry["result"] in ("confirmed", "waitlist") and resolved[entry["user"]] not in inserted_ids:
+            entry["result"] = "already_registered"
+
+    confirmed = sum(status_value == Status.confirmed for _, status_value in inserted)
+    if confirmed:
+        await db.execute(update(Event).where(Event.id == event_id).values(
+            confirmed_count=Event.confirmed_count + confirmed
+        ))
+    if inserted:
+        await bump_stats(db, event_id, registered=len(inserted), waitlist=len(inserted) - confirmed)
+    # fills any seat a lost race left behind
+    await promote_waitlist(db, event_id)
+    await db.commit()
+    return results
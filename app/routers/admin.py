@@ -0,0 +1,34 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.dependencies import current_user_dep
+from app.profiler import reset_slow_queries, slow_queries
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_admin(current_user):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    current_user: current_user_dep,
+    order_by: Literal["total_ms", "max_ms", "count"] = "total_ms",
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Worst statements seen by this worker, see app.profiler."""
+    require_admin(current_user)
+    return slow_queries(order_by, limit)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(current_user: current_user_dep):
+    require_admin(current_user)
+    reset_slow_queries()
+    return None
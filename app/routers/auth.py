@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from jose import JWTError, jwt
+from sqlalchemy import func, select
 
-from app.dependencies import db_dep, current_user_dep
+from app.dependencies import db_dep, current_user_dep, primary_db_dep
 from app.models.models import User
+from app.outbox import enqueue
+from app.principals import invalidate_principal, principal_cache_stats
 from app.schemas.schemas import TokenIn, UserRegisterIn, UserOut
 from app.settings import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
@@ -15,8 +18,8 @@ from app.tasks import send_email
 from app.utils import (
     create_jwt_token,
     generate_confirmation_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -24,18 +27,19 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register/")
 async def register_user(db: db_dep, register_data: UserRegisterIn):
-    is_user_exists = db.query(User).filter(User.email == register_data.email).first()
+    is_user_exists = await db.scalar(select(User).where(User.email == register_data.email))
 
     if is_user_exists:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    is_first_user = db.query(User).count() == 0
+    is_first_user = await db.scalar(select(func.count(User.id))) == 0
+    hashed_password = await hash_password_async(register_data.password)
 
     if is_first_user:
         user = User(
             username=register_data.username,
             email=register_data.email,
-            hashed_password=hash_password(register_data.password),
+            hashed_password=hashed_password,
             is_admin=True,
             is_verified=False,  # not confirmed yet
         )
@@ -43,23 +47,25 @@ async def register_user(db: db_dep, register_data: UserRegisterIn):
         user = User(
             username=register_data.username,
             email=register_data.email,
-            hashed_password=hash_password(register_data.password),
+            hashed_password=hashed_password,
             is_admin=False,
             is_verified=False,  # not confirmed yet
         )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
 
-    # send confirmation email
+    # send confirmation email, committed together with the user
     token = generate_confirmation_token(email=user.email)
 
-    send_email.delay(
+    enqueue(
+        db,
+        send_email,
         to_email=user.email,
         subject="Confirm your registration to Bookla",
         body=f"You can click the link to confirm your email: {FRONTEND_URL}/auth/confirm/{token}/",
     )
+    await db.commit()
+    await db.refresh(user)
 
     return {
         "detail": f"Confirmation email sent to {user.email}. Please confirm to finalize your registration.",
@@ -68,9 +74,17 @@ async def register_user(db: db_dep, register_data: UserRegisterIn):
 
 @router.post("/login/")
 async def login_user(db: db_dep, login_data: UserRegisterIn):
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = await db.scalar(select(User).where(User.email == login_data.email))
 
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(
+            status_code=400, detail="User not found or you entered wrong credentials."
+        )
+
+    is_valid, new_hash = await verify_and_update_password_async(
+        login_data.password, user.hashed_password
+    )
+    if not is_valid:
         raise HTTPException(
             status_code=400, detail="User not found or you entered wrong credentials."
         )
@@ -80,6 +94,12 @@ async def login_user(db: db_dep, login_data: UserRegisterIn):
             status_code=403,
             detail="Please confirm your email before logging in. Check your inbox for the confirmation link.",
         )
+
+    if new_hash:
+        # Argon2 parameters changed since this hash was stored
+        user.hashed_password = new_hash
+        await db.commit()
+
     login_dict = {"email": user.email, "is_admin": user.is_admin}
 
     access_token = create_jwt_token(
@@ -132,12 +152,12 @@ async def get_access_token(db: db_dep, token_data: TokenIn):
 
 
 @router.get("/verify-email/{token}/")
-async def verify_email(db: db_dep, token: str):
+async def verify_email(db: primary_db_dep, token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
         email = payload["email"]
 
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email))
 
         if not user:
             raise HTTPException(status_code=400, detail="User not found")
@@ -146,8 +166,9 @@ async def verify_email(db: db_dep, token: str):
             raise HTTPException(status_code=400, detail="User already confirmed")
 
         user.is_verified = True
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        await invalidate_principal(user.email)
 
         return {"message": "Email confirmed successfully"}
 
@@ -158,8 +179,16 @@ async def verify_email(db: db_dep, token: str):
 
 @router.get("/me", response_model=UserOut)
 async def get_me(current_user: current_user_dep, db: db_dep):
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = await db.get(User, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user
\ No newline at end of file
+    return user
+
+
+@router.get("/principal-cache/stats")
+async def get_principal_cache_stats(current_user: current_user_dep):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return principal_cache_stats()
@@ -1,24 +1,407 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
-from app.models.models import RegistrationStatus as Status
-from sqlalchemy import func
+from datetime import UTC, datetime, timedelta
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import Annotated, List, Literal
+from app.models.models import RegistrationStatus as Status, utcnow
+from sqlalchemy import select, tuple_, union_all
+from sqlalchemy.orm import selectinload
 from typing import Optional
+import orjson
 
 
-from app.dependencies import db_dep, current_user_dep
-from app.models import Event, User, EventRegistration
-from app.schemas.schemas import EventCreateIn, EventOut, EventUpdate, EventRegistrationOut, EventRegistrationCreateIn
+from app.calendars import (
+    calendar_etag, calendar_query, create_calendar_token, etag_matches, ics_lines, read_calendar_token, window_query
+)
+from app.database import open_session, stream_partitions
+from app.dependencies import db_dep, current_user_dep, event_filters_dep, pagination_dep
+from app.event_cache import cached_event, cached_listing, event_cache_stats, invalidate_event
+from app.fanout import NOTIFY_FIELDS, event_changed_fanout, event_deleted_fanout
+from app.exports import csv_lines, gzipped, ndjson_lines
+from app.hot_events import hot_cancel, hot_cancel_many, hot_close, hot_register, hot_resize, prime_hot_event, reconcile_hot_event
+from app.models import ArchivedEventRegistration, Event, EventHourlyStats, EventStats, User, EventRegistration
+from app.outbox import enqueue
+from app.registrations import cancel_registrations, import_registrations, promote_waitlist, register_user_for_event
+from app.search import index_event, search_events, unindex_event
+from app.serializers import EVENT_OUT_COLUMNS, encode_event_page
+from app.settings import EVENT_CACHE_ENABLED, HOT_EVENTS_ENABLED
+from app.tasks import notify_promoted, run_fanout
+from app.schemas.schemas import UTCDateTime, EventCreateIn, EventDashboardPage, EventOut, EventPage, MyRegistrationPage, OrganizedEventPage, EventUpdate, EventRegistrationOut, EventRegistrationCreateIn, RegistrationBulkCancelIn, RegistrationImportIn, RegistrationImportOut
+from app.utils import decode_cursor, decode_rank_cursor, encode_cursor
 
 router = APIRouter(prefix="/events", tags=["events"])
 
-@router.get("/", response_model=List[EventOut])
+
+def apply_event_filters(query, filters: dict):
+    query = query.where(Event.deleted_at.is_(None))
+    if filters["is_active"] is not None:
+        query = query.where(Event.is_active == filters["is_active"])
+    if filters["upcoming"]:
+        # naive UTC like the column; SQL now() would be the server's local time
+        query = query.where(Event.start_datetime >= utcnow())
+    if filters["organizer_id"] is not None:
+        query = query.where(Event.organizer_id == filters["organizer_id"])
+    if filters["starts_after"] is not None:
+        query = query.where(Event.start_datetime >= filters["starts_after"])
+    if filters["starts_before"] is not None:
+        query = query.where(Event.start_datetime < filters["starts_before"])
+    return query
+
+
+async def load_event_page(db, limit: int, filters: dict, keyset) -> bytes:
+    """One listing page as EventPage JSON, see app.serializers."""
+    query = apply_event_filters(select(*EVENT_OUT_COLUMNS), filters)
+    if keyset:
+        query = query.where(tuple_(Event.start_datetime, Event.id) > tuple_(*keyset))
+
+    # one extra row tells us whether another page exists
+    query = query.order_by(Event.start_datetime, Event.id).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_datetime, rows[-1].id)
+
+    return encode_event_page(rows, next_cursor)
+
+
+async def on_primary(db, load):
+    """load(session) on the primary: shared cache entries must not come from a lagging replica."""
+    if not db.info["replica"]:
+        return await load(db)
+    async with open_session() as primary:
+        return await load(primary)
+
+
+def event_payload_loader(event_id: int):
+    async def load(session):
+        db_event = await session.get(Event, event_id)
+        if db_event and not db_event.deleted_at:
+            return EventOut.model_validate(db_event, from_attributes=True).model_dump_json().encode()
+
+    return load
+
+
+async def event_is_hot(db, event_id: int, cached: bool = True) -> bool:
+    """Whether the event's seats live in Redis, so cold events never touch the hot path.
+
+    cached reads the flag from the event cache when it is on; that answer can
+    be seconds old, which only the register path tolerates: the SQL seat
+    decision refuses hot events and is followed by an uncached check.
+    """
+    if cached and EVENT_CACHE_ENABLED:
+        payload = await cached_event(event_id, lambda: on_primary(db, event_payload_loader(event_id)))
+        return payload is not None and orjson.loads(payload)["hot_mode"]
+    return bool(await db.scalar(select(Event.hot_mode).where(Event.id == event_id)))
+
+
+@router.get("/", response_model=EventPage)
 async def get_events(
     db: db_dep,
-    current_user: current_user_dep
+    current_user: current_user_dep,
+    pagination: pagination_dep,
+    filters: event_filters_dep,
+):
+    keyset = None
+    if pagination["cursor"]:
+        try:
+            keyset = decode_cursor(pagination["cursor"])
+        except ValueError as err:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            ) from err
+
+    if not EVENT_CACHE_ENABLED:
+        payload = await load_event_page(db, pagination["limit"], filters, keyset)
+    else:
+        payload = await cached_listing(
+            {"pagination": pagination, "filters": filters},
+            lambda: on_primary(db, lambda session: load_event_page(session, pagination["limit"], filters, keyset)),
+        )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/search", response_model=EventPage)
+async def search(
+    db: db_dep,
+    current_user: current_user_dep,
+    pagination: pagination_dep,
+    filters: event_filters_dep,
+):
+    if not pagination["q"] or not pagination["q"].strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query is required"
+        )
+
+    keyset = None
+    if pagination["cursor"]:
+        try:
+            keyset = decode_rank_cursor(pagination["cursor"])
+        except ValueError as err:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            ) from err
+
+    query = apply_event_filters(select(Event), filters)
+    return await search_events(db, query, pagination["q"], pagination["limit"], keyset)
+
+
+def stream_ndjson(query, readonly: bool):
+    async def body():
+        # own session: the request one may be closed before streaming ends
+        async with open_session(readonly=readonly) as feed_db:
+            async for chunk in ndjson_lines(stream_partitions(feed_db, query)):
+                yield chunk
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.get("/window")
+async def get_events_in_window(
+    db: db_dep,
+    current_user: current_user_dep,
+    # Annotated keeps the UTCDateTime validator, a Query() default would drop it
+    start: Annotated[UTCDateTime, Query(alias="from")],
+    end: Annotated[UTCDateTime, Query(alias="to")],
+):
+    """Active events overlapping [from, to), as NDJSON ordered by start."""
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+
+    return stream_ndjson(window_query(db.bind.dialect.name, start, end), db.info["replica"])
+
+
+@router.get("/upcoming")
+async def get_upcoming_events(
+    db: db_dep,
+    current_user: current_user_dep,
+    days: int = Query(30, ge=1, le=366),
+):
+    """Active events running now or starting in the next days, as NDJSON."""
+    now = utcnow()
+    return stream_ndjson(window_query(db.bind.dialect.name, now, now + timedelta(days=days)), db.info["replica"])
+
+
+@router.get("/me/calendar")
+async def get_my_calendar_url(request: Request, current_user: current_user_dep):
+    """Subscription URL of the caller's .ics feed, calendar apps cannot send a bearer token."""
+    token = create_calendar_token(current_user.id)
+    return {"url": str(request.url_for("get_calendar_feed", token=token))}
+
+
+@router.get("/calendar/{token}.ics")
+async def get_calendar_feed(
+    token: str,
+    request: Request,
+    db: db_dep,
+    if_none_match: str | None = Header(None),
 ):
-    events = db.query(Event).all()
-    return events
+    user_id = read_calendar_token(token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar not found"
+        )
+
+    etag = await calendar_etag(db, user_id)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    query = calendar_query(user_id)
+    host = request.url.hostname or "localhost"
+    # stay on the primary when the ETag was, so the body is not older than it
+    readonly = db.info["replica"]
+
+    async def body():
+        async with open_session(readonly=readonly) as feed_db:
+            async for chunk in ics_lines(stream_partitions(feed_db, query), host):
+                yield chunk
+
+    return StreamingResponse(body(), media_type="text/calendar; charset=utf-8", headers=headers)
+
+
+def decode_cursor_or_400(cursor: str):
+    try:
+        return decode_cursor(cursor)
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        ) from err
+
+
+@router.get("/me/registrations", response_model=MyRegistrationPage)
+async def get_my_registrations(
+    db: db_dep,
+    current_user: current_user_dep,
+    pagination: pagination_dep,
+    status_filter: Optional[Status] = Query(None, alias="status", description="Defaults to every active registration"),
+):
+    """The caller's registrations, newest first, each with its event (one query per page).
+
+    Registrations moved to the archive (see app.archive) are listed too.
+    """
+    keyset = decode_cursor_or_400(pagination["cursor"]) if pagination["cursor"] else None
+
+    def rows(model):
+        query = select(model.id, model.event_id, model.registered_at, model.status).where(
+            model.user_id == current_user.id,
+            model.status == status_filter if status_filter else model.status != Status.cancelled,
+        )
+        if keyset:
+            query = query.where(tuple_(model.registered_at, model.id) < tuple_(*keyset))
+        return query
+
+    # archived rows keep their live ids, so (registered_at, id) stays unique across both
+    registrations = union_all(rows(EventRegistration), rows(ArchivedEventRegistration)).subquery()
+
+    limit = pagination["limit"]
+    page = (await db.execute(
+        select(registrations, Event).join(Event, Event.id == registrations.c.event_id).order_by(
+            registrations.c.registered_at.desc(), registrations.c.id.desc()
+        ).limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].registered_at, page[-1].id)
+
+    items = [
+        {
+            "id": row.id,
+            "status": row.status.value,
+            "registered_at": row.registered_at,
+            "event": row.Event,
+        }
+        for row in page
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/me/organized", response_model=OrganizedEventPage)
+async def get_my_organized_events(
+    db: db_dep,
+    current_user: current_user_dep,
+    pagination: pagination_dep,
+):
+    """The caller's events with their active participants, in three queries per page."""
+    query = select(Event).options(
+        selectinload(Event.registrations.and_(EventRegistration.status != Status.cancelled))
+        .selectinload(EventRegistration.user)
+    ).where(Event.organizer_id == current_user.id, Event.deleted_at.is_(None))
+    if pagination["cursor"]:
+        keyset = decode_cursor_or_400(pagination["cursor"])
+        query = query.where(tuple_(Event.start_datetime, Event.id) > tuple_(*keyset))
+
+    limit = pagination["limit"]
+    events = (await db.scalars(query.order_by(Event.start_datetime, Event.id).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].start_datetime, events[-1].id)
+
+    items = [
+        {
+            **EventOut.model_validate(event, from_attributes=True).model_dump(),
+            "participants": [
+                {
+                    "user_id": registration.user_id,
+                    "username": registration.user.username,
+                    "email": registration.user.email,
+                    "status": registration.status.value,
+                    "registered_at": registration.registered_at,
+                }
+                for registration in sorted(event.registrations, key=lambda registration: registration.id)
+            ],
+        }
+        for event in events
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/dashboard", response_model=EventDashboardPage)
+async def get_dashboard(
+    db: db_dep,
+    current_user: current_user_dep,
+    pagination: pagination_dep,
+    organizer_id: int | None = None,
+    hours: int = Query(24, ge=1, le=24 * 14),
+):
+    """Registration statistics of an organizer's events, read from the rollups in app.stats."""
+    organizer_id = organizer_id or current_user.id
+    if organizer_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to view this dashboard"
+        )
+
+    query = select(
+        Event.id, Event.title, Event.start_datetime, Event.max_participants, Event.confirmed_count,
+        EventStats.registered, EventStats.waitlist, EventStats.cancelled,
+    ).outerjoin(EventStats, EventStats.event_id == Event.id).where(
+        Event.organizer_id == organizer_id,
+        Event.deleted_at.is_(None),
+    )
+    if pagination["cursor"]:
+        keyset = decode_cursor_or_400(pagination["cursor"])
+        query = query.where(tuple_(Event.start_datetime, Event.id) > tuple_(*keyset))
+
+    limit = pagination["limit"]
+    rows = (await db.execute(query.order_by(Event.start_datetime, Event.id).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_datetime, rows[-1].id)
+
+    hourly = {row.id: [] for row in rows}
+    if rows:
+        since = datetime.now(UTC).replace(tzinfo=None) - timedelta(hours=hours)
+        for bucket in await db.scalars(select(EventHourlyStats).where(
+            EventHourlyStats.event_id.in_(list(hourly)),
+            EventHourlyStats.hour >= since,
+        ).order_by(EventHourlyStats.event_id, EventHourlyStats.hour)):
+            hourly[bucket.event_id].append(bucket)
+
+    items = [
+        {
+            "event_id": row.id,
+            "title": row.title,
+            "start_datetime": row.start_datetime,
+            "max_participants": row.max_participants,
+            "confirmed": row.confirmed_count,
+            "fill_rate": row.confirmed_count / row.max_participants if row.max_participants else 0.0,
+            "waitlist": row.waitlist or 0,
+            "cancelled": row.cancelled or 0,
+            "registered": row.registered or 0,
+            "hourly": [
+                {"hour": bucket.hour, "registrations": bucket.registrations, "cancellations": bucket.cancellations}
+                for bucket in hourly[row.id]
+            ],
+        }
+        for row in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/cache/stats")
+async def get_event_cache_stats(current_user: current_user_dep):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+
+    return event_cache_stats()
 
 
 @router.post("/", response_model=EventOut, status_code=status.HTTP_201_CREATED)
@@ -29,8 +412,11 @@ async def create_event(
 ):
     db_event = Event(**event.model_dump(), organizer_id=current_user.id)
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.commit()
+    await db.refresh(db_event)
+    index_event(db_event)
+
+    await invalidate_event(db_event.id)
     return db_event
 
 
@@ -40,13 +426,22 @@ async def get_event(
     db: db_dep,
     current_user: current_user_dep
 ):
-    db_event = db.query(Event).filter(Event.id == event_id).first()
-    if not db_event:
+    if not EVENT_CACHE_ENABLED:
+        db_event = await db.get(Event, event_id)
+        if not db_event or db_event.deleted_at:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        return db_event
+
+    payload = await cached_event(event_id, lambda: on_primary(db, event_payload_loader(event_id)))
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
-    return db_event
+    return Response(content=payload, media_type="application/json")
 
 
 @router.put("/{event_id}", response_model=EventOut)
@@ -56,8 +451,8 @@ async def update_event(
     db: db_dep,
     current_user: current_user_dep
 ):
-    db_event = db.query(Event).filter(Event.id == event_id).first()
-    if not db_event:
+    db_event = await db.get(Event, event_id)
+    if not db_event or db_event.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
@@ -69,13 +464,58 @@ async def update_event(
             detail="Not enough permissions to update this event"
         )
     
+    was_hot = db_event.hot_mode
+    previous_capacity = db_event.max_participants
+
     update_data = event_update.model_dump(exclude_unset=True)
+    # without the Redis path a hot event could never take registrations; switching off stays allowed
+    if update_data.get("hot_mode") and not was_hot and not HOT_EVENTS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Hot mode is not enabled"
+        )
+    turning_off = HOT_EVENTS_ENABLED and was_hot and update_data.get("hot_mode") is False
+    if turning_off:
+        # seats go back to the SQL path as soon as the flag flips: Redis stops taking
+        # them first and what it decided is persisted, so confirmed_count is exact
+        await hot_close(event_id, True)
+        await run_in_threadpool(reconcile_hot_event, event_id, True)
+
+    notify = any(
+        field in update_data and update_data[field] != getattr(db_event, field)
+        for field in NOTIFY_FIELDS
+    )
     for field, value in update_data.items():
         setattr(db_event, field, value)
+    db_event.updated_at = utcnow()
     
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    if notify:
+        fanout = event_changed_fanout(db_event)
+        db.add(fanout)
+        await db.flush()
+        enqueue(db, run_fanout, fanout_id=fanout.id)
+    await db.commit()
+    await db.refresh(db_event)
+    index_event(db_event)
+
+    await invalidate_event(event_id)
+
+    if not db_event.hot_mode and db_event.max_participants > previous_capacity:
+        promoted = await promote_waitlist(db, event_id)
+        if promoted:
+            enqueue(db, notify_promoted, event_id=event_id, user_ids=promoted)
+        await db.commit()
+
+    if HOT_EVENTS_ENABLED and db_event.hot_mode:
+        if not was_hot:
+            await prime_hot_event(db, event_id)
+        elif db_event.max_participants != previous_capacity:
+            await hot_resize(event_id, db_event.max_participants - previous_capacity)
+        await hot_close(event_id, not db_event.is_active)
+    elif turning_off:
+        # retires the Redis state, unless a cancel raced the flag; the reconciler finishes then
+        await run_in_threadpool(reconcile_hot_event, event_id, True)
     
     return db_event
 
@@ -86,8 +526,8 @@ async def delete_event(
     db: db_dep,
     current_user: current_user_dep
 ):
-    db_event = db.query(Event).filter(Event.id == event_id).first()
-    if not db_event:
+    db_event = await db.get(Event, event_id)
+    if not db_event or db_event.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
@@ -99,8 +539,20 @@ async def delete_event(
             detail="Not enough permissions to delete this event"
         )
     
-    db.delete(db_event)
-    db.commit()
+    if HOT_EVENTS_ENABLED and db_event.hot_mode:
+        await hot_close(event_id, True)
+
+    # soft delete; the fan-out cancels registrations once every registrant has been told
+    db_event.is_active = False
+    db_event.updated_at = db_event.deleted_at = utcnow()
+    fanout = event_deleted_fanout(db_event)
+    db.add(fanout)
+    await db.flush()
+    enqueue(db, run_fanout, fanout_id=fanout.id)
+    await db.commit()
+    unindex_event(event_id)
+
+    await invalidate_event(event_id)
     
     return None
 
@@ -110,51 +562,53 @@ async def register_for_event(
     db: db_dep,
     current_user: current_user_dep
 ):
-    event = db.query(Event).filter(
-        Event.id == event_id,
-        Event.is_active == True
-    ).first()
-    
-    if not event:
+    registration = None
+    # without the event cache Redis is asked first, which keeps hot events off the database
+    try_redis = HOT_EVENTS_ENABLED and (not EVENT_CACHE_ENABLED or await event_is_hot(db, event_id))
+    hot_status = await hot_register(event_id, current_user.id) if try_redis else "cold"
+
+    # "closed" is an inactive event, or one whose hot mode was just switched off
+    if hot_status in ("cold", "closed"):
+        registration = await register_user_for_event(db, event_id, current_user.id)
+        # the SQL path refuses hot events, load them into Redis and retry there
+        if (
+            registration is None
+            and HOT_EVENTS_ENABLED
+            and await event_is_hot(db, event_id, cached=False)
+            and await prime_hot_event(db, event_id)
+        ):
+            hot_status = await hot_register(event_id, current_user.id)
+
+    if hot_status in ("confirmed", "waitlist"):
+        # persisted by the hot event reconciler, so there is no id yet
+        registration_id, status_value = None, Status(hot_status)
+    elif registration is not None:
+        registration_id, status_value = registration
+    elif hot_status == "duplicate":
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found or inactive"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are already registered for this event"
         )
-    
-    existing_registration = db.query(EventRegistration).filter(
-        EventRegistration.event_id == event_id,
-        EventRegistration.user_id == current_user.id,
-        EventRegistration.status != Status.cancelled
-    ).first()
-    
-    if existing_registration:
+    else:
+        event = await db.scalar(select(Event.id).where(
+            Event.id == event_id,
+            Event.is_active == True
+        ))
+        if not event or hot_status == "closed":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found or inactive"
+            )
+
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You are already registered for this event"
         )
-    
-    confirmed_count = db.query(func.count(EventRegistration.id)).filter(
-        EventRegistration.event_id == event_id,
-        EventRegistration.status == Status.confirmed
-    ).scalar()
 
-
-    status_value = Status.confirmed if confirmed_count < event.max_participants else Status.waitlist
-
-    registration = EventRegistration(
-        user_id=current_user.id,
-        event_id=event_id,
-        status=status_value
-    )
-    
-    db.add(registration)
-    db.commit()
-    db.refresh(registration)
-    
     return {
         "message": f"Successfully registered for event. Status: {status_value.value}",
         "status": status_value.value,
-        "registration_id": registration.id
+        "registration_id": registration_id
     }
 
 
@@ -164,72 +618,213 @@ async def cancel_registration(
     db: db_dep,
     current_user: current_user_dep
 ):
-    registration = db.query(EventRegistration).filter(
-        EventRegistration.event_id == event_id,
-        EventRegistration.user_id == current_user.id,
-        EventRegistration.status != Status.cancelled
-    ).first()
+    # uncached: a stale flag would let the SQL path cancel under Redis
+    if HOT_EVENTS_ENABLED and await event_is_hot(db, event_id, cached=False):
+        hot_status = await hot_cancel(event_id, current_user.id)
+        if hot_status == "cold" and await prime_hot_event(db, event_id):
+            hot_status = await hot_cancel(event_id, current_user.id)
+
+        if hot_status == "none":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No active registration found for this event"
+            )
+        if hot_status != "cold":
+            return {"message": "Registration cancelled successfully"}
+
+    cancelled = await cancel_registrations(db, event_id, [current_user.id])
     
-    if not registration:
+    if not cancelled:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No active registration found for this event"
         )
-    
-    previous_status = registration.status
-
-    registration.status = Status.cancelled
-    db.commit()
-
-    if previous_status == Status.confirmed:
-        waitlisted = db.query(EventRegistration).filter(
-            EventRegistration.event_id == event_id,
-            EventRegistration.status == Status.waitlist
-        ).order_by(EventRegistration.registered_at.asc()).first()
-        
-        if waitlisted:
-            waitlisted.status = Status.confirmed
-            db.commit()
-            
+
+    promoted = await promote_waitlist(db, event_id)
+    if promoted:
+        enqueue(db, notify_promoted, event_id=event_id, user_ids=promoted)
+    await db.commit()
     
     return {"message": "Registration cancelled successfully"}
 
 
-@router.get("/{event_id}/participants", response_model=List[dict])
-async def get_event_participants(
+@router.post("/{event_id}/registrations/cancel", status_code=status.HTTP_200_OK)
+async def bulk_cancel_registrations(
     event_id: int,
+    payload: RegistrationBulkCancelIn,
     db: db_dep,
-    current_user: current_user_dep,
-    status: Optional[Status] = Query(None, description="Filter participants by status")
+    current_user: current_user_dep
 ):
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
+    event = await db.get(Event, event_id)
+    if not event or event.deleted_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
-    
+
     if event.organizer_id != current_user.id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view participant list"
+            detail="Not enough permissions to cancel registrations for this event"
         )
-    
-    query = db.query(
+
+    if event.archived_at:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Registrations of an archived event cannot be cancelled"
+        )
+
+    if HOT_EVENTS_ENABLED and event.hot_mode:
+        results = await hot_cancel_many(event_id, payload.user_ids)
+        cancelled = sum(result not in ("none", "cold") for result in results)
+        return {"cancelled": cancelled, "promoted": None}
+
+    cancelled = await cancel_registrations(db, event_id, payload.user_ids)
+    promoted = await promote_waitlist(db, event_id)
+    if promoted:
+        enqueue(db, notify_promoted, event_id=event_id, user_ids=promoted)
+    await db.commit()
+
+    return {"cancelled": cancelled, "promoted": len(promoted)}
+
+
+@router.post("/{event_id}/registrations/import", response_model=RegistrationImportOut)
+async def import_event_registrations(
+    event_id: int,
+    payload: RegistrationImportIn,
+    db: db_dep,
+    current_user: current_user_dep
+):
+    event = await db.get(Event, event_id)
+    if not event or event.deleted_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+    if event.organizer_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to import registrations for this event"
+        )
+
+    if event.hot_mode:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Registrations cannot be imported while the event is in hot mode"
+        )
+
+    if not event.is_active or event.archived_at:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Registrations cannot be imported into an inactive or archived event"
+        )
+
+    results = await import_registrations(db, event_id, payload.users)
+    # the event changed between the checks above and its row lock
+    if results is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event is no longer open for registrations"
+        )
+    counts = {"confirmed": 0, "waitlist": 0}
+    for entry in results:
+        if entry["result"] in counts:
+            counts[entry["result"]] += 1
+
+    return {
+        **counts,
+        "skipped": len(results) - counts["confirmed"] - counts["waitlist"],
+        "results": results,
+    }
+
+
+def participants_query(event_id: int, status_filter: Status | None, archived: bool = False):
+    registrations = ArchivedEventRegistration if archived else EventRegistration
+    query = select(
         User.username,
         User.email,
-        EventRegistration.status,
-        EventRegistration.registered_at
+        registrations.status,
+        registrations.registered_at
     ).join(
-        EventRegistration,
-        User.id == EventRegistration.user_id
-    ).filter(
-        EventRegistration.event_id == event_id,
-        EventRegistration.status != Status.cancelled
+        registrations,
+        User.id == registrations.user_id
+    ).where(
+        registrations.event_id == event_id,
+        registrations.status != Status.cancelled
     )
-    
 
-    if status:
-        query = query.filter(EventRegistration.status == status)
+    if status_filter:
+        query = query.where(registrations.status == status_filter)
+    return query
+
+
+async def get_managed_event(db, event_id: int, current_user):
+    event = await db.get(Event, event_id)
+    if not event or event.deleted_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
     
-    return query or []
+    if event.organizer_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view participant list"
+        )
+    return event
+
+
+@router.get("/{event_id}/participants", response_model=List[dict])
+async def get_event_participants(
+    event_id: int,
+    db: db_dep,
+    current_user: current_user_dep,
+    status_filter: Optional[Status] = Query(None, alias="status", description="Filter participants by status")
+):
+    event = await get_managed_event(db, event_id, current_user)
+
+    result = await db.execute(participants_query(event_id, status_filter, event.archived_at is not None))
+    return [dict(row) for row in result.mappings()]
+
+
+@router.get("/{event_id}/participants/export")
+async def export_event_participants(
+    event_id: int,
+    db: db_dep,
+    current_user: current_user_dep,
+    status_filter: Optional[Status] = Query(None, alias="status", description="Filter participants by status"),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False
+):
+    event = await get_managed_event(db, event_id, current_user)
+
+    archived = event.archived_at is not None
+    registrations = ArchivedEventRegistration if archived else EventRegistration
+    query = participants_query(event_id, status_filter, archived).order_by(
+        registrations.registered_at, registrations.id
+    )
+
+    readonly = db.info["replica"]
+
+    async def body():
+        # own session: the request one may be closed before streaming ends
+        async with open_session(readonly=readonly) as export_db:
+            batches = stream_partitions(export_db, query)
+            if format == "csv":
+                chunks = csv_lines(batches, ["username", "email", "status", "registered_at"])
+            else:
+                chunks = ndjson_lines(batches)
+            if gzip:
+                chunks = gzipped(chunks)
+            async for chunk in chunks:
+                yield chunk
+
+    filename = f"event-{event_id}-participants.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
@@ -1,5 +1,17 @@
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+from datetime import UTC, datetime
+from typing import Annotated
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Aware datetimes converted to naive UTC; naive ones are taken as UTC already."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+# client-supplied datetimes, in the naive UTC form the columns store
+UTCDateTime = Annotated[datetime, AfterValidator(naive_utc)]
 
 
 class UserRegisterIn(BaseModel):
@@ -16,6 +28,20 @@ class UserOut(BaseModel):
     created_at: datetime
 
 
+class Principal(BaseModel):
+    """Snapshot of the authenticated user kept in the principal cache."""
+
+    id: int
+    email: str
+    username: str | None = None
+    is_active: bool
+    is_verified: bool
+    is_admin: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "frozen": True}
+
+
 class TokenIn(BaseModel):
     refresh_token: str
 
@@ -28,19 +54,20 @@ class TokenOut(BaseModel):
 class EventCreateIn(BaseModel):
     title: str
     description: str | None = None
-    start_datetime: datetime
-    end_datetime: datetime
+    start_datetime: UTCDateTime
+    end_datetime: UTCDateTime
     location: str | None = None
     max_participants: int | None = 100
 
 class EventUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
-    start_datetime: datetime | None = None
-    end_datetime: datetime | None = None
+    start_datetime: UTCDateTime | None = None
+    end_datetime: UTCDateTime | None = None
     location: str | None = None
     max_participants: int | None = None
     is_active: bool | None = True
+    hot_mode: bool | None = None
 
 class EventOut(BaseModel):
     id: int
@@ -51,13 +78,81 @@ class EventOut(BaseModel):
     location: str | None = None
     max_participants: int | None = 100
     is_active: bool
+    hot_mode: bool = False
     created_at: datetime
 
+class EventPage(BaseModel):
+    items: list[EventOut]
+    next_cursor: str | None = None
+
+class MyRegistrationOut(BaseModel):
+    id: int
+    status: str
+    registered_at: datetime
+    event: EventOut
+
+class MyRegistrationPage(BaseModel):
+    items: list[MyRegistrationOut]
+    next_cursor: str | None = None
+
+class ParticipantOut(BaseModel):
+    user_id: int
+    username: str
+    email: str
+    status: str
+    registered_at: datetime
+
+class OrganizedEventOut(EventOut):
+    participants: list[ParticipantOut]
+
+class OrganizedEventPage(BaseModel):
+    items: list[OrganizedEventOut]
+    next_cursor: str | None = None
+
+class EventHourlyStatsOut(BaseModel):
+    hour: datetime
+    registrations: int
+    cancellations: int
+
+class EventStatsOut(BaseModel):
+    event_id: int
+    title: str
+    start_datetime: datetime
+    max_participants: int
+    confirmed: int
+    fill_rate: float
+    waitlist: int
+    cancelled: int
+    registered: int
+    hourly: list[EventHourlyStatsOut]
+
+class EventDashboardPage(BaseModel):
+    items: list[EventStatsOut]
+    next_cursor: str | None = None
+
 class EventRegistrationCreateIn(BaseModel):
     user_id: int
     event_id: int
     status: str | None = "waitlist"
 
+class RegistrationBulkCancelIn(BaseModel):
+    # one IN list on SQLite, see app.registrations.IN_CHUNK_SIZE
+    user_ids: list[int] = Field(max_length=10000)
+
+class RegistrationImportIn(BaseModel):
+    # user ids or emails, seats are allocated in this order
+    users: list[int | EmailStr] = Field(min_length=1, max_length=50000)
+
+class RegistrationImportRowOut(BaseModel):
+    user: int | str
+    result: str
+
+class RegistrationImportOut(BaseModel):
+    confirmed: int
+    waitlist: int
+    skipped: int
+    results: list[RegistrationImportRowOut]
+
 class EventRegistrationOut(BaseModel):
     id: int
     user_id: int
@@ -0,0 +1,172 @@
+"""Full-text event search over title, description and location.
+
+Postgres matches against the generated `search_vector` column through its
+GIN index (migration a8c4e2f9b713) and ranks with ts_rank_cd. Other
+databases use an in-process inverted index that is loaded on the first
+search and kept current by the event write routes of this process; the
+database stays the source of truth for filters and for what is returned.
+
+Writes made by other workers reach the index through the shared event
+generation (app.event_cache.GENERATION_KEY, incremented by every event
+write): the index is rebuilt when it has moved. Without Redis there is no
+shared generation and the index only sees this worker's writes, so that
+setup is single-worker only.
+"""
+import asyncio
+import re
+from bisect import bisect_right
+from collections import Counter
+
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.database import stream_partitions
+from app.event_cache import shared_generation
+from app.models import Event
+from app.utils import encode_rank_cursor
+
+SEARCH_CONFIG = "english"
+
+search_vector = literal_column("events.search_vector", TSVECTOR)
+
+# same defaults as ts_rank_cd for the A/B/C weights the migration assigns
+FIELD_WEIGHTS = {"title": 1.0, "description": 0.4, "location": 0.2}
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InvertedIndex:
+    """token -> {event_id: weighted term frequency}, matched with AND semantics."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[int, float]] = {}
+        self.documents: dict[int, set[str]] = {}
+        self.loaded = False
+        # shared generation the index was built at
+        self.generation = None
+        self._lock = asyncio.Lock()
+
+    def add(self, event_id: int, **fields):
+        self.remove(event_id)
+        scores = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(fields.get(field)):
+                scores[token] += weight
+
+        for token, score in scores.items():
+            self.postings.setdefault(token, {})[event_id] = score
+        self.documents[event_id] = set(scores)
+
+    def remove(self, event_id: int):
+        for token in self.documents.pop(event_id, ()):
+            postings = self.postings[token]
+            postings.pop(event_id, None)
+            if not postings:
+                del self.postings[token]
+
+    def search(self, q: str) -> list[tuple[float, int]]:
+        """Returns (-score, event_id) pairs, best match first."""
+        tokens = set(tokenize(q))
+        if not tokens:
+            return []
+
+        # intersect starting from the rarest token
+        lists = sorted((self.postings.get(token, {}) for token in tokens), key=len)
+        matches = {
+            event_id: score for event_id, score in lists[0].items()
+            if all(event_id in postings for postings in lists[1:])
+        }
+        for postings in lists[1:]:
+            for event_id in matches:
+                matches[event_id] += postings[event_id]
+
+        return sorted((-score, event_id) for event_id, score in matches.items())
+
+    async def load(self, db, generation: bytes | None = None):
+        """Builds the index, or rebuilds it if generation differs from the one it was built at."""
+        async with self._lock:
+            if self.loaded and generation == self.generation:
+                return
+            self.postings.clear()
+            self.documents.clear()
+            # read before the rows, so a write committed during the load triggers another rebuild
+            self.generation = generation
+            statement = select(Event.id, Event.title, Event.description, Event.location)
+            async for batch in stream_partitions(db, statement):
+                for event_id, title, description, location in batch:
+                    self.add(event_id, title=title, description=description, location=location)
+            self.loaded = True
+
+
+event_index = InvertedIndex()
+
+
+def index_event(event: Event):
+    # a write racing the initial load is applied on top of it, it is already committed
+    if event_index.loaded or event_index._lock.locked():
+        event_index.add(event.id, title=event.title, description=event.description, location=event.location)
+
+
+def unindex_event(event_id: int):
+    event_index.remove(event_id)
+
+
+def _page(items, ranks, limit):
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_rank_cursor(ranks[limit - 1], items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def _search_postgres(db, query, q, limit, keyset):
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(search_vector, tsquery)
+
+    query = query.add_columns(rank.label("rank")).where(search_vector.op("@@")(tsquery))
+    if keyset:
+        last_rank, last_id = keyset
+        query = query.where(or_(rank < last_rank, and_(rank == last_rank, Event.id > last_id)))
+
+    rows = (await db.execute(query.order_by(rank.desc(), Event.id).limit(limit + 1))).all()
+    return _page([event for event, _ in rows], [rank for _, rank in rows], limit)
+
+
+async def _search_index(db, query, q, limit, keyset):
+    await event_index.load(db, await shared_generation())
+    ranked = event_index.search(q)
+
+    position = 0
+    if keyset:
+        last_rank, last_id = keyset
+        position = bisect_right(ranked, (-last_rank, last_id))
+
+    # the index only proposes candidates, the filtered query decides which exist
+    items, ranks = [], []
+    while len(items) <= limit and position < len(ranked):
+        chunk = ranked[position:position + 2 * (limit + 1)]
+        position += len(chunk)
+        found = {event.id: event for event in (await db.scalars(
+            query.where(Event.id.in_([event_id for _, event_id in chunk]))
+        )).all()}
+        for score, event_id in chunk:
+            if event_id in found:
+                items.append(found[event_id])
+                ranks.append(-score)
+
+    return _page(items[:limit + 1], ranks, limit)
+
+
+async def search_events(db, query, q: str, limit: int, keyset=None):
+    """Ranked page of the events in query that match q.
+
+    Ordered by rank then id; keyset is the (rank, id) of the previous page's
+    last row.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return await _search_postgres(db, query, q, limit, keyset)
+    return await _search_index(db, query, q, limit, keyset)
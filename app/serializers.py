@@ -0,0 +1,27 @@
+"""JSON fast path for list endpoints.
+
+Rows are selected as plain tuples of exactly the response model's fields and
+encoded straight to bytes with orjson, skipping ORM instances and Pydantic
+validation. The projection and key order are fixed once at import.
+"""
+import orjson
+
+from app.models import Event
+from app.schemas.schemas import EventOut
+
+EVENT_OUT_FIELDS = tuple(EventOut.model_fields)
+EVENT_OUT_COLUMNS = tuple(getattr(Event, field) for field in EVENT_OUT_FIELDS)
+
+# the columns hold naive UTC datetimes, which orjson and Pydantic both write
+# without an offset; OPT_UTC_Z keeps the two identical ("Z", not "+00:00")
+# should an aware UTC value ever come through
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def encode_event_page(rows, next_cursor: str | None) -> bytes:
+    """Encodes EVENT_OUT_COLUMNS rows as an EventPage document."""
+    fields = EVENT_OUT_FIELDS
+    return orjson.dumps(
+        {"items": [dict(zip(fields, row)) for row in rows], "next_cursor": next_cursor},
+        option=ORJSON_OPTIONS,
+    )
@@ -29,4 +29,84 @@ EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
 
-FRONTEND_URL = os.getenv("FRONTEND_URL")
\ No newline at end of file
+FRONTEND_URL = os.getenv("FRONTEND_URL")
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# "local" keeps principals in the per-worker LRU only, "redis" adds a shared tier
+PRINCIPAL_CACHE_BACKEND = os.getenv("PRINCIPAL_CACHE_BACKEND", "local")
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+
+# Argon2 parameters; hashes created with other values are upgraded on login
+ARGON2_TIME_COST = os.getenv("ARGON2_TIME_COST")
+ARGON2_MEMORY_COST = os.getenv("ARGON2_MEMORY_COST")
+ARGON2_PARALLELISM = os.getenv("ARGON2_PARALLELISM")
+
+# "thread" or "process"; workers default to the number of cores
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or os.cpu_count()
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+
+# flash-sale mode: hot events take seats from Redis and are persisted by a reconciler
+HOT_EVENTS_ENABLED = os.getenv("HOT_EVENTS_ENABLED", "false").lower() == "true"
+HOT_EVENT_RECONCILE_INTERVAL = float(os.getenv("HOT_EVENT_RECONCILE_INTERVAL", "2"))
+HOT_EVENT_RECONCILE_BATCH = int(os.getenv("HOT_EVENT_RECONCILE_BATCH", "500"))
+
+
+# read-through cache for event detail and listing payloads
+EVENT_CACHE_ENABLED = os.getenv("EVENT_CACHE_ENABLED", "false").lower() == "true"
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", "5000"))
+# the local tier bounds how stale another worker's copy can be after a write
+EVENT_CACHE_LOCAL_TTL = int(os.getenv("EVENT_CACHE_LOCAL_TTL", "5"))
+EVENT_CACHE_TTL = int(os.getenv("EVENT_CACHE_TTL", "300"))
+
+
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+# connections kept open per worker process, idle ones are probed with NOOP
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_IDLE_CHECK_SECONDS = int(os.getenv("SMTP_IDLE_CHECK_SECONDS", "30"))
+# messages per second allowed towards SMTP_SERVER from one worker process, 0 disables
+SMTP_RATE_LIMIT = float(os.getenv("SMTP_RATE_LIMIT", "0"))
+SMTP_MAX_RETRIES = int(os.getenv("SMTP_MAX_RETRIES", "5"))
+
+
+# registrants read per fan-out step, and recipients per send_bulk_emails task
+FANOUT_CHUNK_SIZE = int(os.getenv("FANOUT_CHUNK_SIZE", "1000"))
+FANOUT_BATCH_SIZE = int(os.getenv("FANOUT_BATCH_SIZE", "100"))
+# a running fan-out without progress for this long is picked up again
+FANOUT_STALE_SECONDS = int(os.getenv("FANOUT_STALE_SECONDS", "600"))
+
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+# "memory" for a single node, "redis" to share buckets across the cluster
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# JSON list of {"method", "path", "rate" (tokens/s), "burst", "key": "ip"|"user"}, replaces the defaults
+RATE_LIMIT_RULES = os.getenv("RATE_LIMIT_RULES")
+# honour X-Forwarded-For, only behind a proxy that sets it
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# requests issuing more SQL statements than this are logged and counted as likely N+1
+METRICS_QUERY_WARN_THRESHOLD = int(os.getenv("METRICS_QUERY_WARN_THRESHOLD", "20"))
+
+
+# statements slower than this are logged and aggregated by app.profiler, 0 disables
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_TOP_N = int(os.getenv("SLOW_QUERY_TOP_N", "50"))
+# share of slow statements whose plan is captured with EXPLAIN (once per fingerprint)
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0"))
+
+
+# registrations of events that ended (or were deleted) this long ago move to the archive table
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+ARCHIVE_INTERVAL = int(os.getenv("ARCHIVE_INTERVAL", "3600"))
@@ -0,0 +1,184 @@
+"""Incrementally maintained registration statistics.
+
+Every path that changes registrations adds its deltas to `event_stats` and
+the hourly buckets in `event_hourly_stats` within its own transaction, so
+the organizer dashboard never aggregates raw registrations. Rollups can be
+rebuilt from the raw rows at any time:
+
+    python -m app.stats [--event-id ID ...]
+
+Cancellation times are not stored on registrations, so a rebuild keeps the
+hourly cancellation counts and recomputes everything else. Registrations moved
+to event_registrations_archive by app.archive are counted as well.
+"""
+import argparse
+from datetime import UTC, datetime
+
+from sqlalchemy import bindparam, delete, func, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import SessionLocal
+from app.models import ArchivedEventRegistration, Event, EventHourlyStats, EventRegistration, EventStats
+from app.models.models import RegistrationStatus as Status
+
+REBUILD_BATCH_SIZE = 500
+
+
+def _insert(dialect: str):
+    return pg_insert if dialect == "postgresql" else sqlite_insert
+
+
+def to_hour(at: datetime | None = None) -> datetime:
+    """The naive UTC hour bucket of at (now by default)."""
+    at = at or datetime.now(UTC)
+    if at.tzinfo is not None:
+        at = at.astimezone(UTC).replace(tzinfo=None)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def counter_update(dialect: str, event_id: int, registered=0, waitlist=0, cancelled=0):
+    stats = EventStats.__table__
+    stmt = _insert(dialect)(stats).values(
+        event_id=event_id, registered=registered, waitlist=waitlist, cancelled=cancelled
+    )
+    return stmt.on_conflict_do_update(index_elements=["event_id"], set_={
+        "registered": stats.c.registered + stmt.excluded.registered,
+        "waitlist": stats.c.waitlist + stmt.excluded.waitlist,
+        "cancelled": stats.c.cancelled + stmt.excluded.cancelled,
+    })
+
+
+def hourly_update(dialect: str, event_id: int, hour: datetime, registrations=0, cancellations=0):
+    hourly = EventHourlyStats.__table__
+    stmt = _insert(dialect)(hourly).values(
+        event_id=event_id, hour=hour, registrations=registrations, cancellations=cancellations
+    )
+    return stmt.on_conflict_do_update(index_elements=["event_id", "hour"], set_={
+        "registrations": hourly.c.registrations + stmt.excluded.registrations,
+        "cancellations": hourly.c.cancellations + stmt.excluded.cancellations,
+    })
+
+
+async def bump_stats(db, event_id: int, registered=0, waitlist=0, cancelled=0):
+    """Adds registration deltas to an event's rollups in the caller's transaction.
+
+    registered and cancelled also count towards the current hour bucket;
+    waitlist is the change in waitlist depth and may be negative.
+    """
+    dialect = db.bind.dialect.name
+    await db.execute(counter_update(dialect, event_id, registered, waitlist, cancelled))
+    if registered or cancelled:
+        await db.execute(hourly_update(dialect, event_id, to_hour(), registered, cancelled))
+
+
+def _hour_bucket(dialect: str, registered_at):
+    if dialect == "postgresql":
+        return func.date_trunc("hour", registered_at)
+    return func.strftime("%Y-%m-%d %H:00:00", registered_at)
+
+
+def _registrations(event_ids: list[int]):
+    """Live and archived registrations of event_ids; an event may be partly archived."""
+    def rows(model):
+        return select(model.event_id, model.status, model.registered_at).where(model.event_id.in_(event_ids))
+
+    return union_all(rows(EventRegistration), rows(ArchivedEventRegistration)).subquery()
+
+
+def rebuild_counters(db, event_ids: list[int]):
+    """Recounts event_stats and Event.confirmed_count of event_ids from raw rows (sync Session)."""
+    dialect = db.bind.dialect.name
+    registrations = _registrations(event_ids)
+    counts = {event_id: {status: 0 for status in Status} for event_id in event_ids}
+    for event_id, status, total in db.execute(select(
+        registrations.c.event_id, registrations.c.status, func.count()
+    ).group_by(registrations.c.event_id, registrations.c.status)):
+        counts[event_id][status] = total
+
+    db.execute(delete(EventStats).where(EventStats.event_id.in_(event_ids)))
+    db.execute(_insert(dialect)(EventStats.__table__), [
+        {
+            "event_id": event_id,
+            "registered": sum(by_status.values()),
+            "waitlist": by_status[Status.waitlist],
+            "cancelled": by_status[Status.cancelled],
+        }
+        for event_id, by_status in counts.items()
+    ])
+
+    events = Event.__table__
+    db.execute(update(events).where(events.c.id == bindparam("b_id")).values(
+        confirmed_count=bindparam("b_confirmed")
+    ), [
+        {"b_id": event_id, "b_confirmed": by_status[Status.confirmed]}
+        for event_id, by_status in counts.items()
+    ])
+
+
+def rebuild_hourly(db, event_ids: list[int]):
+    """Recomputes the hourly registration counts of event_ids (sync Session)."""
+    dialect = db.bind.dialect.name
+    registrations = _registrations(event_ids)
+    hour = _hour_bucket(dialect, registrations.c.registered_at)
+    buckets = db.execute(select(registrations.c.event_id, hour, func.count()).group_by(
+        registrations.c.event_id, hour
+    )).all()
+
+    hourly = EventHourlyStats.__table__
+    db.execute(update(hourly).where(hourly.c.event_id.in_(event_ids)).values(registrations=0))
+    if buckets:
+        stmt = _insert(dialect)(hourly)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["event_id", "hour"],
+            set_={"registrations": stmt.excluded.registrations},
+        ), [
+            {
+                "event_id": event_id,
+                # SQLite buckets come back as text
+                "hour": bucket if isinstance(bucket, datetime) else datetime.fromisoformat(bucket),
+                "registrations": total,
+                "cancellations": 0,
+            }
+            for event_id, bucket, total in buckets
+        ])
+    db.execute(delete(hourly).where(
+        hourly.c.event_id.in_(event_ids),
+        hourly.c.registrations == 0,
+        hourly.c.cancellations == 0,
+    ))
+
+
+def rebuild_stats(event_ids: list[int] | None = None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Rebuilds the rollups of event_ids (all events by default), one transaction per batch.
+
+    Each batch holds its event rows locked so live registrations wait
+    instead of racing the recount. Returns the number of events rebuilt.
+    """
+    rebuilt, last_id = 0, 0
+    with SessionLocal() as db:
+        while True:
+            query = select(Event.id).where(Event.id > last_id).order_by(Event.id).limit(batch_size)
+            if event_ids is not None:
+                query = query.where(Event.id.in_(event_ids))
+            batch = db.scalars(query.with_for_update()).all()
+            if not batch:
+                return rebuilt
+
+            rebuild_counters(db, batch)
+            rebuild_hourly(db, batch)
+            db.commit()
+            rebuilt += len(batch)
+            last_id = batch[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild event statistics from raw registrations.")
+    parser.add_argument("--event-id", type=int, action="append", dest="event_ids")
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+    print(f"rebuilt statistics of {rebuild_stats(args.event_ids, args.batch_size)} events")
+
+
+if __name__ == "__main__":
+    main()
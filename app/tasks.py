@@ -1,14 +1,21 @@
 import smtplib
-from email.mime.text import MIMEText
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy import select
 
+from app import archive, fanout, hot_events
+from app.database import SessionLocal, engine
+from app.mailer import build_message, smtp_pool
+from app.models import Event, User
+from app.profiler import install_profiler
 from app.settings import (
+    ARCHIVE_INTERVAL,
     CELERY_BROKER_URL,
     CELERY_RESULT_BACKEND,
-    EMAIL_ADDRESS,
-    EMAIL_PASSWORD,
-    SMTP_PORT,
-    SMTP_SERVER,
+    FANOUT_STALE_SECONDS,
+    HOT_EVENT_RECONCILE_INTERVAL,
+    HOT_EVENTS_ENABLED,
+    SMTP_MAX_RETRIES,
 )
 
 clry = Celery(
@@ -17,14 +24,96 @@ clry = Celery(
     backend=CELERY_RESULT_BACKEND,
 )
 
+clry.conf.beat_schedule = {
+    "resume-fanouts": {
+        "task": "app.tasks.resume_fanouts",
+        "schedule": FANOUT_STALE_SECONDS,
+    },
+    "archive-events": {
+        "task": "app.tasks.archive_events",
+        "schedule": ARCHIVE_INTERVAL,
+    },
+}
+
+if HOT_EVENTS_ENABLED:
+    clry.conf.beat_schedule["reconcile-hot-events"] = {
+        "task": "app.tasks.reconcile_hot_events",
+        "schedule": HOT_EVENT_RECONCILE_INTERVAL,
+    }
+
+
+@worker_process_init.connect
+def profile_queries(**kwargs):
+    install_profiler(engine)
+
+
+@worker_process_shutdown.connect
+def close_smtp_pool(**kwargs):
+    smtp_pool.close_all()
+
+
+def retry_countdown(task):
+    return min(2 ** task.request.retries, 300)
+
+
+@clry.task(bind=True, max_retries=SMTP_MAX_RETRIES)
+def send_email(self, to_email: str, subject: str, body: str):
+    try:
+        smtp_pool.send([build_message(to_email, subject, body)])
+    except (smtplib.SMTPException, OSError) as err:
+        raise self.retry(exc=err, countdown=retry_countdown(self))
+
+
+@clry.task(bind=True, max_retries=SMTP_MAX_RETRIES)
+def send_bulk_emails(self, messages: list[dict]):
+    """Sends [{"to_email", "subject", "body"}, ...] over pooled SMTP sessions.
+
+    On failure only the messages that were not handed to the server yet are retried.
+    """
+    try:
+        smtp_pool.send([build_message(**message) for message in messages])
+    except (smtplib.SMTPException, OSError) as err:
+        remaining = messages[getattr(err, "sent", 0):]
+        raise self.retry(args=[remaining], exc=err, countdown=retry_countdown(self))
+
+
+@clry.task
+def notify_promoted(event_id: int, user_ids: list[int]):
+    """Tells a batch of users promoted off the waitlist."""
+    with SessionLocal() as db:
+        title = db.scalar(select(Event.title).where(Event.id == event_id))
+        emails = db.scalars(select(User.email).where(User.id.in_(user_ids))).all()
+
+    if title is None or not emails:
+        return
+
+    send_bulk_emails.delay([
+        {
+            "to_email": email,
+            "subject": f"You're in: {title}",
+            "body": f"A seat opened up and your registration for {title} is now confirmed.",
+        }
+        for email in emails
+    ])
+
+
+@clry.task
+def reconcile_hot_events():
+    hot_events.reconcile_hot_events()
+
+
+# acks_late: a worker crash hands the fan-out to another worker, which resumes it
+@clry.task(acks_late=True)
+def run_fanout(fanout_id: int):
+    fanout.run_fanout(fanout_id, send_bulk_emails)
+
+
+@clry.task
+def resume_fanouts():
+    for fanout_id in fanout.unfinished_fanouts():
+        run_fanout.delay(fanout_id)
+
+
 @clry.task
-def send_email(to_email: str, subject: str, body: str):
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_ADDRESS
-    msg["To"] = to_email
-
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
+def archive_events():
+    archive.archive_events()
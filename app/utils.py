@@ -1,15 +1,37 @@
+import asyncio
+import base64
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
+from fastapi import HTTPException
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.settings import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     ALGORITHM,
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    PASSWORD_HASH_EXECUTOR,
+    PASSWORD_HASH_QUEUE_SIZE,
+    PASSWORD_HASH_RETRY_AFTER,
+    PASSWORD_HASH_WORKERS,
     SECRET_KEY,
 )
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+argon2_params = {
+    key: int(value)
+    for key, value in {
+        "argon2__rounds": ARGON2_TIME_COST,
+        "argon2__memory_cost": ARGON2_MEMORY_COST,
+        "argon2__parallelism": ARGON2_PARALLELISM,
+    }.items()
+    if value
+}
+
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto", **argon2_params)
 
 
 def hash_password(password: str):
@@ -20,6 +42,49 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password, hashed_password):
+    """Returns (is_valid, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+_hash_executor = None
+_hash_pending = 0
+
+
+def _get_hash_executor():
+    global _hash_executor
+    if _hash_executor is None:
+        executor_class = ProcessPoolExecutor if PASSWORD_HASH_EXECUTOR == "process" else ThreadPoolExecutor
+        _hash_executor = executor_class(max_workers=PASSWORD_HASH_WORKERS)
+    return _hash_executor
+
+
+async def _run_hashing(func, *args):
+    """Runs an Argon2 call off the event loop, shedding load once the queue is full."""
+    global _hash_pending
+    if _hash_pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly.",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+        )
+
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password_async(password: str):
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password, hashed_password):
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_jwt_token(data: dict, expires_delta: float | None = None):
 
 
@@ -43,4 +108,32 @@ def generate_confirmation_token(email):
         "email": email,
         "exp": datetime.now(UTC) + timedelta(hours=1),
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def encode_cursor(start_datetime: datetime, id: int):
+    raw = json.dumps([start_datetime.isoformat(), id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """Returns the (start_datetime, id) keyset, raises ValueError if malformed."""
+    try:
+        start_datetime, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(start_datetime), int(id)
+    except (TypeError, json.JSONDecodeError, UnicodeDecodeError) as err:
+        raise ValueError("Invalid cursor") from err
+
+
+def encode_rank_cursor(rank: float, id: int):
+    raw = json.dumps([rank, id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_rank_cursor(cursor: str):
+    """Returns the (rank, id) keyset of a search page, raises ValueError if malformed."""
+    try:
+        rank, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(id)
+    except (TypeError, json.JSONDecodeError, UnicodeDecodeError) as err:
+        raise ValueError("Invalid cursor") from err
@@ -0,0 +1,55 @@
+"""Compares two benchmarks.runner result files, for CI:
+
+    python -m benchmarks.compare baseline.json results.json --tolerance 0.10
+
+Exits with status 1 when a scenario's p95 latency grew, or its throughput
+fell, by more than the tolerance.
+"""
+import argparse
+import json
+
+
+def change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before
+
+
+def percent(value):
+    return "n/a" if value is None else f"{value:+.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        baseline = json.load(baseline_file)["scenarios"]
+        current = json.load(current_file)["scenarios"]
+
+    regressions = []
+    print(f"{'scenario':<14} {'p95 ms':>20} {'change':>8} {'req/s':>22} {'change':>8}")
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name], current[name]
+        p95 = change(before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        rps = change(before["throughput_rps"], after["throughput_rps"])
+        print(
+            f"{name:<14} {before['latency_ms']['p95']:>9.2f} -> {after['latency_ms']['p95']:<8.2f} {percent(p95):>8} "
+            f"{before['throughput_rps']:>10.1f} -> {after['throughput_rps']:<9.1f} {percent(rps):>8}"
+        )
+        if (p95 is not None and p95 > args.tolerance) or (rps is not None and rps < -args.tolerance):
+            regressions.append(name)
+
+    for name in sorted(baseline.keys() ^ current.keys()):
+        print(f"{name:<14} only in {'baseline' if name in baseline else 'current'}")
+
+    if regressions:
+        print(f"regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
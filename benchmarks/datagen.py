@@ -0,0 +1,157 @@
+"""Seeded synthetic dataset for the benchmarks.
+
+Bulk-loads users, events and registrations. Registrations follow a Zipf-like
+popularity curve over events plus a few hot events that draw a large share,
+so seat counts, waitlists and cancellations look like production:
+
+    python -m benchmarks.datagen --db-url sqlite:///benchmark.db --users 10000 --events 2000 --registrations 100000
+
+SQLite schemas are created from the models. Postgres must be migrated first
+(alembic upgrade head) so the search and range indexes exist.
+"""
+import argparse
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from itertools import accumulate
+
+from benchmarks.env import PASSWORD, configure
+
+BATCH_SIZE = 5000
+WORDS = (
+    "python data cloud security design music jazz rock startup finance health yoga running "
+    "marketing product summit workshop meetup conference hackathon festival night tour "
+    "beginners advanced open source community local global future ai web mobile"
+).split()
+CITIES = ["Tashkent", "Samarkand", "Berlin", "Lisbon", "Austin", "Seoul", "Nairobi", "Toronto"]
+
+
+def batches(rows, size=BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def make_users(count, hashed_password, now):
+    return [
+        {
+            "id": i,
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_verified": True,
+            "is_admin": i == 1,
+            "created_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def make_events(rng, count, users, hot, now):
+    events = []
+    for i in range(1, count + 1):
+        start = now + timedelta(days=rng.uniform(-60, 180), hours=rng.randint(0, 23))
+        events.append({
+            "id": i,
+            "title": " ".join(rng.sample(WORDS, 3)).title(),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+            "start_datetime": start,
+            "end_datetime": start + timedelta(hours=rng.choice([1, 2, 3, 8, 48])),
+            "location": rng.choice(CITIES),
+            # hot events are the first ones, sized to overflow into their waitlist
+            "max_participants": 500 if i <= hot else rng.choice([10, 20, 50, 100, 200]),
+            "confirmed_count": 0,
+            "is_active": rng.random() > 0.05,
+            "hot_mode": False,
+            "created_at": now,
+            "updated_at": now,
+            "organizer_id": rng.randint(1, users),
+        })
+    return events
+
+
+def make_registrations(rng, count, users, events, hot, now):
+    # Zipf-like weights, hot events take about a third of all registrations
+    weights = [1 / rank for rank in range(1, len(events) + 1)]
+    hot_weight = sum(weights) / 2 / max(hot, 1)
+    weights = [hot_weight if i < hot else weight for i, weight in enumerate(weights)]
+    cumulative = list(accumulate(weights))
+
+    taken, registrations = set(), []
+    attempts = 0
+    while len(registrations) < count and attempts < count * 3:
+        attempts += 1
+        event = events[rng.choices(range(len(events)), cum_weights=cumulative)[0]]
+        user_id = rng.randint(1, users)
+        if (event["id"], user_id) in taken:
+            continue
+        taken.add((event["id"], user_id))
+
+        if rng.random() < 0.05:
+            status = "cancelled"
+        elif event["confirmed_count"] < event["max_participants"]:
+            status = "confirmed"
+            event["confirmed_count"] += 1
+        else:
+            status = "waitlist"
+        registrations.append({
+            "id": len(registrations) + 1,
+            "user_id": user_id,
+            "event_id": event["id"],
+            "registered_at": now - timedelta(seconds=count - len(registrations)),
+            "status": status,
+        })
+    return registrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--registrations", type=int, default=100000)
+    parser.add_argument("--hot", type=int, default=3, help="events drawing a large share of registrations")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db_url = configure(args.db_url)
+
+    from sqlalchemy import create_engine, insert
+
+    from app.database import Base
+    from app.models import Event, EventRegistration, User
+    from app.utils import hash_password
+
+    engine = create_engine(db_url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+
+    rng = random.Random(args.seed)
+    now = datetime.now(UTC).replace(tzinfo=None, microsecond=0)
+    users = make_users(args.users, hash_password(PASSWORD), now)
+    events = make_events(rng, args.events, args.users, args.hot, now)
+    registrations = make_registrations(rng, args.registrations, args.users, events, args.hot, now)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        if engine.dialect.name != "sqlite":
+            conn.exec_driver_sql("TRUNCATE event_registrations, events, users RESTART IDENTITY CASCADE")
+        for table, rows in ((User, users), (Event, events), (EventRegistration, registrations)):
+            for batch in batches(rows):
+                conn.execute(insert(table.__table__), batch)
+        if engine.dialect.name == "postgresql":
+            # explicit ids leave the sequences behind
+            for table in ("users", "events", "event_registrations"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+
+    print(
+        f"loaded {len(users)} users, {len(events)} events, {len(registrations)} registrations "
+        f"in {time.perf_counter() - started:.1f}s (seed {args.seed})"
+    )
+
+
+if __name__ == "__main__":
+    main()
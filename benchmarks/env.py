@@ -0,0 +1,20 @@
+"""Environment for benchmark runs, applied before anything imports app.*"""
+import os
+
+DEFAULT_DB_URL = "sqlite:///benchmark.db"
+PASSWORD = "benchmark-password"
+
+
+def configure(db_url: str | None = None):
+    os.environ["DB_URL"] = db_url or os.environ.get("DB_URL") or DEFAULT_DB_URL
+    os.environ.pop("ASYNC_DB_URL", None)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "600")
+    os.environ.setdefault("REFRESH_TOKEN_EXPIRE_MINUTES", "1440")
+    # measure the SQL path alone unless a run opts in
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("HOT_EVENTS_ENABLED", "false")
+    os.environ.setdefault("EVENT_CACHE_ENABLED", "false")
+    return os.environ["DB_URL"]
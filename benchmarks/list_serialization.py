@@ -0,0 +1,103 @@
+"""Rows per second of the event listing, ORM + Pydantic versus the projection path.
+
+Seeds a SQLite database with events, then builds listing pages of 100, 1k
+and 10k rows both ways:
+
+    python -m benchmarks.list_serialization --repeat 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.env import configure
+
+PAGE_SIZES = (100, 1000, 10000)
+NO_FILTERS = {"is_active": None, "upcoming": False, "organizer_id": None, "starts_after": None, "starts_before": None}
+
+
+async def orm_page(db, limit):
+    """The listing before the fast path: ORM instances validated by EventPage."""
+    from sqlalchemy import select
+
+    from app.models import Event
+    from app.schemas.schemas import EventPage
+
+    events = (await db.scalars(select(Event).order_by(Event.start_datetime, Event.id).limit(limit + 1))).all()
+    page = {"items": events[:limit], "next_cursor": None}
+    return EventPage.model_validate(page, from_attributes=True).model_dump_json().encode()
+
+
+async def projection_page(db, limit):
+    from app.routers.events import load_event_page
+
+    return await load_event_page(db, limit, NO_FILTERS, None)
+
+
+def seed(rows):
+    from sqlalchemy import create_engine, insert
+
+    from app.database import Base, DB_URL
+    from app.models import Event, User
+
+    engine = create_engine(DB_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{
+            "id": 1, "username": "organizer", "email": "organizer@example.com", "hashed_password": "x",
+            "is_active": True, "is_verified": True, "is_admin": False, "created_at": start,
+        }])
+        conn.execute(insert(Event.__table__), [{
+            "title": f"Event {i}",
+            "description": "A benchmark event " * 10,
+            "start_datetime": start + timedelta(minutes=i),
+            "end_datetime": start + timedelta(minutes=i + 90),
+            "location": "Tashkent",
+            "max_participants": 100,
+            "confirmed_count": 0,
+            "is_active": True,
+            "hot_mode": False,
+            "created_at": start,
+            "updated_at": start,
+            "organizer_id": 1,
+        } for i in range(rows)])
+
+
+async def measure(name, build, limit, repeat):
+    from app.database import open_session
+
+    async with open_session() as db:
+        payload = await build(db, limit)  # warm up
+        started = time.perf_counter()
+        for _ in range(repeat):
+            payload = await build(db, limit)
+            # ORM instances would otherwise be served from the identity map
+            db.expunge_all()
+        elapsed = time.perf_counter() - started
+    rate = limit * repeat / elapsed
+    print(f"{name:<12} page {limit:>6}  {elapsed / repeat * 1000:9.2f} ms/page  {rate:12.0f} rows/s  {len(payload):>9} bytes")
+    return rate
+
+
+async def run(repeat):
+    for limit in PAGE_SIZES:
+        before = await measure("orm", orm_page, limit, repeat)
+        after = await measure("projection", projection_page, limit, repeat)
+        print(f"{'':<12} page {limit:>6}  speedup {after / before:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default="sqlite:///serialization-benchmark.db")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    configure(args.db_url)
+    seed(max(PAGE_SIZES) + 1)
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
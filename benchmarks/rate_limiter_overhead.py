@@ -0,0 +1,77 @@
+"""Per-request overhead of RateLimitMiddleware with the in-memory backend.
+
+Drives the middleware directly with a no-op ASGI app so only the limiter is
+measured, for a rate-limited route and one that no rule matches:
+
+    python -m benchmarks.rate_limiter_overhead --requests 100000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_MINUTES", "1440")
+
+from app.middlewares import MemoryRateLimitBackend, RateLimitMiddleware, RateLimitRule  # noqa: E402
+
+# target from the request: the limiter must stay below this per request
+BUDGET_US = 100
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+def make_scope(path, client_ip):
+    return {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "headers": [(b"authorization", b"Bearer header.payload.signature" + client_ip.encode())],
+        "client": (client_ip, 50000),
+    }
+
+
+async def measure(name, app, scopes):
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    per_request = (time.perf_counter() - started) / len(scopes) * 1_000_000
+    print(f"{name:<28} {len(scopes):>8} reqs  {per_request:8.2f} us/req")
+    return per_request
+
+
+async def run(requests, clients):
+    # generous burst so every request takes the allowed path through the bucket
+    rules = [RateLimitRule("POST", "/events/{event_id}/register", rate=1e9, burst=10**9, key="user")]
+    limited = RateLimitMiddleware(noop_app, MemoryRateLimitBackend(), rules)
+
+    scopes = [make_scope(f"/events/{i % 50}/register", f"10.0.{i % clients // 256}.{i % 256}") for i in range(requests)]
+    unmatched = [make_scope("/events/", scope["client"][0]) for scope in scopes]
+
+    baseline = await measure("no middleware", noop_app, scopes)
+    matched = await measure("limited route", limited, scopes) - baseline
+    passthrough = await measure("unlimited route", limited, unmatched) - baseline
+    print(f"overhead: {matched:.2f} us limited, {passthrough:.2f} us unlimited (budget {BUDGET_US} us)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.clients))
+
+
+if __name__ == "__main__":
+    main()
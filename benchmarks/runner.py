@@ -0,0 +1,227 @@
+"""Scenario runner for the API, in-process over ASGI or against a live server.
+
+Reports p50/p95/p99 latency and throughput per scenario and can save them as
+JSON for benchmarks.compare. Load a dataset with benchmarks.datagen first:
+
+    python -m benchmarks.runner --db-url sqlite:///benchmark.db --output results.json
+    python -m benchmarks.runner --base-url http://127.0.0.1:8000 --scenarios list_events,register
+
+A live server must share the database and SECRET_KEY/ALGORITHM of the run.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import UTC, datetime, timedelta
+from itertools import count
+
+from benchmarks.env import configure
+
+SEARCH_TERMS = ["python", "jazz", "summit workshop", "open source", "ai", "community meetup"]
+
+
+class Context:
+    """Dataset facts the scenarios draw their requests from."""
+
+    def __init__(self, rng, users, events, hot, tokens):
+        self.rng = rng
+        self.users = users
+        self.events = events
+        self.hot = hot
+        self.tokens = tokens
+        self.next_user = count(1)
+
+    def token(self, user_id=None):
+        return self.tokens(user_id or self.rng.randint(1, self.users))
+
+    def popular_event(self):
+        # the same skew the generator used, hot events first
+        if self.hot and self.rng.random() < 0.5:
+            return self.rng.randint(1, self.hot)
+        return min(int(self.rng.paretovariate(1.2)), self.events)
+
+
+def list_events(ctx):
+    return "GET", "/events/?limit=100&is_active=true", ctx.token()
+
+
+def event_detail(ctx):
+    return "GET", f"/events/{ctx.popular_event()}", ctx.token()
+
+
+def search(ctx):
+    return "GET", f"/events/search?q={ctx.rng.choice(SEARCH_TERMS)}&limit=20", ctx.token()
+
+
+def window(ctx):
+    start = datetime.now(UTC).replace(tzinfo=None) + timedelta(days=ctx.rng.randint(0, 90))
+    end = start + timedelta(days=7)
+    return "GET", f"/events/window?from={start.isoformat()}&to={end.isoformat()}", ctx.token()
+
+
+def register(ctx):
+    # distinct users walking through the id space, mostly onto hot events
+    user_id = (next(ctx.next_user) - 1) % ctx.users + 1
+    return "POST", f"/events/{ctx.popular_event()}/register", ctx.token(user_id)
+
+
+SCENARIOS = {
+    "list_events": list_events,
+    "event_detail": event_detail,
+    "search": search,
+    "window": window,
+    "register": register,
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, name, ctx, requests, concurrency, warmup):
+    make_request = SCENARIOS[name]
+    latencies, statuses = [], {}
+
+    async def one(record):
+        method, url, token = make_request(ctx)
+        started = time.perf_counter()
+        response = await client.request(method, url, headers={"Authorization": f"Bearer {token}"})
+        # streamed endpoints count until their last byte
+        await response.aread()
+        elapsed = time.perf_counter() - started
+        if record:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    for _ in range(warmup):
+        await one(False)
+
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            await one(True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": sum(n for code, n in statuses.items() if code >= 500),
+        "status_counts": {str(code): n for code, n in sorted(statuses.items())},
+        "throughput_rps": len(latencies) / wall if wall else None,
+        "latency_ms": {
+            "p50": percentile(ms, 50),
+            "p95": percentile(ms, 95),
+            "p99": percentile(ms, 99),
+            "mean": sum(ms) / len(ms) if ms else None,
+            "max": ms[-1] if ms else None,
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import func, select
+
+    from app.database import engine
+    from app.models import Event, User
+    from app.settings import ACCESS_TOKEN_EXPIRE_MINUTES
+    from app.utils import create_jwt_token
+
+    with engine.connect() as conn:
+        users = conn.scalar(select(func.count(User.id)))
+        events = conn.scalar(select(func.count(Event.id)))
+    if not users or not events:
+        raise SystemExit("empty database, run python -m benchmarks.datagen first")
+
+    token_cache = {}
+
+    def tokens(user_id):
+        if user_id not in token_cache:
+            token_cache[user_id] = create_jwt_token(
+                {"email": f"user{user_id}@example.com", "is_admin": user_id == 1},
+                expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES,
+            )
+        return token_cache[user_id]
+
+    ctx = Context(random.Random(args.seed), users, events, args.hot, tokens)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = {}
+    async with client:
+        for name in args.scenarios.split(","):
+            results[name] = await run_scenario(client, name, ctx, args.requests, args.concurrency, args.warmup)
+            latency = results[name]["latency_ms"]
+            print(
+                f"{name:<14} {results[name]['requests']:>7} reqs  "
+                f"{results[name]['throughput_rps']:9.1f} req/s  "
+                f"p50 {latency['p50']:8.2f}ms  p95 {latency['p95']:8.2f}ms  p99 {latency['p99']:8.2f}ms  "
+                f"{results[name]['status_counts']}"
+            )
+
+    return {
+        "meta": {
+            "started_at": datetime.now(UTC).isoformat(),
+            "commit": git_commit(),
+            "target": args.base_url or "asgi",
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "users": users,
+            "events": events,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url")
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--hot", type=int, default=3, help="must match the datagen run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    configure(args.db_url)
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
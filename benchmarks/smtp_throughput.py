@@ -0,0 +1,68 @@
+"""SMTP delivery throughput against a local aiosmtpd stand-in.
+
+Compares one connection per message (the old send_email) with the pooled
+session used by app.mailer:
+
+    python -m benchmarks.smtp_throughput --messages 2000
+"""
+import argparse
+import os
+import smtplib
+import time
+
+# the stand-in speaks plain SMTP without auth
+os.environ["SMTP_STARTTLS"] = "false"
+os.environ.pop("EMAIL_PASSWORD", None)
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_MINUTES", "1440")
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.handlers import Sink  # noqa: E402
+
+from app.mailer import SMTPPool, build_message  # noqa: E402
+
+
+def per_message_connection(host, port, messages):
+    for msg in messages:
+        with smtplib.SMTP(host, port) as server:
+            server.send_message(msg)
+
+
+def pooled(host, port, messages):
+    pool = SMTPPool(host, port, size=1)
+    pool.send(messages)
+    pool.close_all()
+
+
+def measure(name, send, host, port, messages):
+    started = time.perf_counter()
+    send(host, port, messages)
+    elapsed = time.perf_counter() - started
+    rate = len(messages) / elapsed
+    print(f"{name:<24} {len(messages):>6} msgs  {elapsed:8.3f}s  {rate:10.1f} msgs/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    controller = Controller(Sink(), hostname=host, port=args.port)
+    controller.start()
+    try:
+        messages = [
+            build_message(f"user{i}@example.com", "Benchmark", "Hello from the benchmark")
+            for i in range(args.messages)
+        ]
+        baseline = measure("connection per message", per_message_connection, host, args.port, messages)
+        pooled_rate = measure("pooled session", pooled, host, args.port, messages)
+        print(f"speedup: {pooled_rate / baseline:.1f}x")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Shared fixtures.
+
+The app reads its settings at import, so the environment is set up before
+anything imports app.*. Tests run on a throwaway SQLite file by default;
+point TEST_DB_URL at an empty Postgres database to run them there:
+
+    TEST_DB_URL=postgresql+psycopg2://postgres@localhost:5432/events_test uv run pytest
+"""
+import os
+import tempfile
+
+from benchmarks.env import configure
+
+configure(os.environ.get("TEST_DB_URL") or f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+import httpx
+import pytest
+from sqlalchemy import delete, insert
+
+from app.database import Base, async_engine, engine
+from app.event_cache import detail_cache, listing_cache
+from app.models import Event, User
+from app.models.models import utcnow
+from app.principals import principal_cache
+from app.utils import create_jwt_token
+
+# a fixed placeholder, no test logs in with a password
+HASHED_PASSWORD = "not-a-real-hash"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    # SQLite gets the same schema; Postgres-only indexes carry ddl_if in the models
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def clear_tables():
+    # ids restart at 1, so user N is always userN@example.com
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+            conn.exec_driver_sql(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+        else:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(delete(table))
+    # cached principals and events would outlive the rows they were read from
+    principal_cache.clear()
+    detail_cache.clear()
+    listing_cache.clear()
+
+
+@pytest.fixture
+def db():
+    """Empty tables, for tests that insert their own rows."""
+    clear_tables()
+    yield engine
+
+
+@pytest.fixture(params=["async", "sync"])
+def db_mode(request, monkeypatch):
+    """Serves the test's requests through AsyncSession, then through the sync Session adapter."""
+    from app import database
+
+    if request.param == "async" and database.async_engine is None:
+        pytest.skip("no async engine under DB_MODE=sync")
+    monkeypatch.setattr(database, "DB_MODE", request.param)
+    return request.param
+
+
+@pytest.fixture
+async def client(db, db_mode):
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # pooled asyncpg connections belong to this test's event loop
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def create_users(count: int) -> list[int]:
+    """Users 1..count; call it once per test, on cleared tables."""
+    rows = [
+        {
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": HASHED_PASSWORD,
+            "is_active": True,
+            "is_verified": True,
+            "created_at": utcnow(),
+        }
+        for i in range(1, count + 1)
+    ]
+    with engine.begin() as conn:
+        return list(conn.execute(insert(User).returning(User.id), rows).scalars())
+
+
+def create_event(organizer_id: int, max_participants: int = 10, **values) -> int:
+    now = utcnow()
+    row = {
+        "title": "Test event",
+        "description": "",
+        "start_datetime": now,
+        "end_datetime": now,
+        "location": "Berlin",
+        "max_participants": max_participants,
+        "organizer_id": organizer_id,
+        **values,
+    }
+    with engine.begin() as conn:
+        return conn.execute(insert(Event).values(row).returning(Event.id)).scalar_one()
+
+
+def auth(user_id: int) -> dict:
+    token = create_jwt_token({"email": f"user{user_id}@example.com"})
+    return {"Authorization": f"Bearer {token}"}
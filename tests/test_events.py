@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import fakeredis
+import pytest
+from sqlalchemy import event, update
+
+from app import event_cache, search
+from app.models import Event
+from app.models.models import utcnow
+from tests.conftest import auth, create_event, create_users
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def server_timezone(db):
+    """Postgres sessions in a zone far from UTC, where SQL now() and utcnow() disagree."""
+    from app.database import async_engine, engine
+
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+
+    def set_timezone(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SET TIME ZONE 'Pacific/Kiritimati'")
+        cursor.close()
+
+    for target in engines:
+        target.pool.dispose()
+        event.listen(target, "connect", set_timezone)
+    yield
+    for target in engines:
+        event.remove(target, "connect", set_timezone)
+        target.pool.dispose()
+
+
+async def test_upcoming_uses_utc(server_timezone, client):
+    organizer, = create_users(1)
+    now = utcnow()
+    create_event(organizer, start_datetime=now - timedelta(hours=1))
+    soon = create_event(organizer, start_datetime=now + timedelta(hours=1))
+
+    response = await client.get("/events/?upcoming=true", headers=auth(organizer))
+
+    assert [item["id"] for item in response.json()["items"]] == [soon]
+
+
+async def test_search_index_follows_other_workers(client, db, monkeypatch):
+    if db.dialect.name == "postgresql":
+        pytest.skip("Postgres searches the search_vector column, there is no index to go stale")
+    redis = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(event_cache, "redis_client", redis)
+    monkeypatch.setattr(search, "event_index", search.InvertedIndex())
+    organizer, = create_users(1)
+    response = await client.post("/events/", json={
+        "title": "Harbour concert",
+        "start_datetime": (utcnow() + timedelta(days=1)).isoformat(),
+        "end_datetime": (utcnow() + timedelta(days=1, hours=2)).isoformat(),
+    }, headers=auth(organizer))
+    event_id = response.json()["id"]
+    response = await client.get("/events/search?q=harbour", headers=auth(organizer))
+    assert [item["id"] for item in response.json()["items"]] == [event_id]
+
+    # another worker renames the event, its invalidation moves the shared generation
+    with db.begin() as conn:
+        conn.execute(update(Event).where(Event.id == event_id).values(title="Lakeside concert"))
+    await redis.incr(event_cache.GENERATION_KEY)
+
+    response = await client.get("/events/search?q=harbour", headers=auth(organizer))
+    assert response.json()["items"] == []
+    response = await client.get("/events/search?q=lakeside", headers=auth(organizer))
+    assert [item["id"] for item in response.json()["items"]] == [event_id]
@@ -0,0 +1,139 @@
+"""Hot mode against a fake Redis: seats decided by the Lua scripts never
+exceed capacity, and the reconciler persists exactly what Redis decided."""
+import asyncio
+
+import fakeredis
+import pytest
+from sqlalchemy import select
+
+from app import hot_events
+from app.models import EventRegistration
+from app.routers import events as events_router
+from tests.conftest import auth, create_event, create_users
+from tests.test_registrations import seat_counts
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    async_client = fakeredis.FakeAsyncRedis(server=server)
+    sync_client = fakeredis.FakeRedis(server=server)
+    monkeypatch.setattr(hot_events, "redis_client", async_client)
+    monkeypatch.setattr(hot_events, "sync_redis_client", sync_client)
+    monkeypatch.setattr(hot_events, "async_scripts", hot_events._load_scripts(async_client))
+    monkeypatch.setattr(hot_events, "sync_scripts", hot_events._load_scripts(sync_client))
+    monkeypatch.setattr(events_router, "HOT_EVENTS_ENABLED", True)
+    return sync_client
+
+
+def redis_members(redis, event_id: int) -> dict[int, str]:
+    members = redis.hgetall(hot_events.hot_keys(event_id)[1])
+    return {int(user): status.decode() for user, status in members.items()}
+
+
+def db_members(engine, event_id: int) -> dict[int, str]:
+    with engine.connect() as conn:
+        rows = conn.execute(select(EventRegistration.user_id, EventRegistration.status).where(
+            EventRegistration.event_id == event_id
+        ))
+        return {user_id: status.value for user_id, status in rows if status.value != "cancelled"}
+
+
+async def test_register_cancel_promote_reconcile(client, db, redis):
+    organizer, *users = create_users(41)
+    event_id = create_event(organizer, max_participants=10)
+
+    # two registrations through SQL first, so priming has members to load
+    for user_id in users[:2]:
+        await client.post(f"/events/{event_id}/register", headers=auth(user_id))
+    response = await client.put(f"/events/{event_id}", json={"hot_mode": True}, headers=auth(organizer))
+    assert response.status_code == 200
+
+    responses = await asyncio.gather(*(
+        client.post(f"/events/{event_id}/register", headers=auth(user_id)) for user_id in users[2:]
+    ))
+    assert [response.status_code for response in responses] == [201] * len(users[2:])
+    assert [response.json()["status"] for response in responses].count("confirmed") == 8
+
+    confirmed = [user_id for user_id, status in redis_members(redis, event_id).items() if status == "confirmed"]
+    waitlisted = [user_id for user_id, status in redis_members(redis, event_id).items() if status == "waitlist"]
+    # cancelled seats go to the waitlist, cancelled waitlist spots do not
+    responses = await asyncio.gather(*(
+        client.delete(f"/events/{event_id}/register", headers=auth(user_id))
+        for user_id in confirmed[:4] + waitlisted[-3:]
+    ))
+    assert [response.status_code for response in responses] == [200] * 7
+
+    members = redis_members(redis, event_id)
+    assert list(members.values()).count("confirmed") == 10
+    assert list(members.values()).count("waitlist") == 40 - 10 - 7
+    assert int(redis.get(hot_events.hot_keys(event_id)[0])) == 0
+
+    hot_events.reconcile_hot_event(event_id)
+
+    assert redis.llen(hot_events.hot_keys(event_id)[3]) == 0
+    assert db_members(db, event_id) == members
+    assert seat_counts(db, event_id) == (10, 10)
+
+
+async def test_turning_hot_mode_off_hands_seats_back_to_sql(client, db, redis):
+    organizer, *users = create_users(16)
+    event_id = create_event(organizer, max_participants=10)
+    await client.put(f"/events/{event_id}", json={"hot_mode": True}, headers=auth(organizer))
+    for user_id in users[:12]:
+        await client.post(f"/events/{event_id}/register", headers=auth(user_id))
+
+    # drained by the request itself, before the SQL path can take a seat
+    await client.put(f"/events/{event_id}", json={"hot_mode": False}, headers=auth(organizer))
+    assert not redis.exists(hot_events.hot_keys(event_id)[0])
+
+    # the SQL path takes over from the persisted counter
+    await client.delete(f"/events/{event_id}/register", headers=auth(users[0]))
+    responses = await asyncio.gather(*(
+        client.post(f"/events/{event_id}/register", headers=auth(user_id)) for user_id in users[12:]
+    ))
+    assert {response.json()["status"] for response in responses} == {"waitlist"}
+    assert seat_counts(db, event_id) == (10, 10)
+
+
+async def test_cold_events_stay_off_the_hot_path(client, db, redis, monkeypatch):
+    calls = []
+
+    def record(name):
+        async def call(*args):
+            calls.append(name)
+        return call
+
+    for name in ("hot_register", "hot_cancel", "prime_hot_event"):
+        monkeypatch.setattr(events_router, name, record(name))
+    monkeypatch.setattr(events_router, "EVENT_CACHE_ENABLED", True)
+    organizer, user_id = create_users(2)
+    event_id = create_event(organizer)
+
+    url = f"/events/{event_id}/register"
+    assert (await client.post(url, headers=auth(user_id))).status_code == 201
+    assert (await client.post(url, headers=auth(user_id))).status_code == 400
+    assert (await client.delete(url, headers=auth(user_id))).status_code == 200
+    assert (await client.delete(url, headers=auth(user_id))).status_code == 404
+    assert calls == []
+
+
+async def test_bulk_cancel_in_hot_mode(client, db, redis):
+    organizer, *users = create_users(6)
+    event_id = create_event(organizer, max_participants=2)
+    await client.put(f"/events/{event_id}", json={"hot_mode": True}, headers=auth(organizer))
+    for user_id in users:
+        await client.post(f"/events/{event_id}/register", headers=auth(user_id))
+
+    response = await client.post(
+        f"/events/{event_id}/registrations/cancel", json={"user_ids": users[:3] + [999]}, headers=auth(organizer)
+    )
+
+    assert response.json() == {"cancelled": 3, "promoted": None}
+    # the two freed seats went to the next two on the waitlist
+    assert redis_members(redis, event_id) == {users[3]: "confirmed", users[4]: "confirmed"}
+
+    hot_events.reconcile_hot_event(event_id)
+    assert seat_counts(db, event_id) == (2, 2)
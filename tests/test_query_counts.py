@@ -0,0 +1,66 @@
+"""The "me" listings load related rows in a fixed number of statements per page."""
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.models import EventRegistration
+from app.models.models import RegistrationStatus as Status, utcnow
+from tests.conftest import auth, create_event, create_users
+
+pytestmark = pytest.mark.anyio
+
+
+@contextmanager
+def statements():
+    from app.database import DB_MODE, async_engine, engine
+
+    target = async_engine.sync_engine if DB_MODE == "async" else engine
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(target, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def organizer(db):
+    """User 1 organizes 12 events, users 2-5 hold a registration for each."""
+    organizer, *attendees = create_users(5)
+    now = utcnow()
+    rows = []
+    for i in range(12):
+        event_id = create_event(organizer, start_datetime=now + timedelta(days=i), end_datetime=now + timedelta(days=i))
+        rows += [
+            {"user_id": user_id, "event_id": event_id, "registered_at": now, "status": Status.confirmed}
+            for user_id in attendees
+        ]
+    with db.begin() as conn:
+        conn.execute(insert(EventRegistration), rows)
+    return organizer
+
+
+async def count_statements(client, url: str, user_id: int) -> int:
+    headers = auth(user_id)
+    # the first request also loads the caller's principal
+    assert (await client.get(url, headers=headers)).status_code == 200
+    with statements() as executed:
+        response = await client.get(url, headers=headers)
+    assert response.status_code == 200
+    return len(executed)
+
+
+@pytest.mark.parametrize("url, user_id, expected", [
+    ("/events/me/registrations", 2, 1),
+    ("/events/me/organized", 1, 3),
+])
+async def test_statements_do_not_grow_with_page_size(client, organizer, url, user_id, expected):
+    small = await count_statements(client, f"{url}?limit=2", user_id)
+    large = await count_statements(client, f"{url}?limit=10", user_id)
+    assert small == large == expected
@@ -0,0 +1,89 @@
+"""The hot lookups stay on their indexes.
+
+Runs EXPLAIN on the statements the app issues, against a seeded dataset with
+fresh statistics, and fails when a table is read with a sequential scan.
+"""
+import random
+import re
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.models import Event, EventRegistration, User
+from app.models.models import RegistrationStatus as Status, utcnow
+from benchmarks.datagen import batches, make_events, make_registrations, make_users
+from tests.conftest import HASHED_PASSWORD, clear_tables
+
+
+@pytest.fixture(scope="module")
+def conn():
+    from app.database import engine
+
+    clear_tables()
+    rng = random.Random(42)
+    now = utcnow().replace(microsecond=0)
+    users = make_users(2000, HASHED_PASSWORD, now)
+    events = make_events(rng, 200, len(users), 3, now)
+    registrations = make_registrations(rng, 20000, len(users), events, 3, now)
+
+    with engine.begin() as conn:
+        for table, rows in ((User, users), (Event, events), (EventRegistration, registrations)):
+            for batch in batches(rows):
+                conn.execute(insert(table.__table__), batch)
+        conn.exec_driver_sql("ANALYZE")
+
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # the planner may still prefer a seq scan on a small table; with it
+            # priced out, one left in the plan means no index can serve the query
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        yield conn
+    clear_tables()
+
+
+def explain(conn, statement) -> str:
+    sql = str(statement.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        return "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + sql))
+    return "\n".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+
+
+def assert_uses_index(plan: str, index: str):
+    assert index in plan, plan
+    assert "Seq Scan" not in plan, plan
+    # SQLite reports a full table read as a bare "SCAN <table>"
+    assert not re.search(r"^SCAN \w+$", plan, re.M), plan
+
+
+def test_active_registration_lookup(conn):
+    event_id, user_id = conn.execute(select(EventRegistration.event_id, EventRegistration.user_id).where(
+        EventRegistration.status != Status.cancelled
+    ).limit(1)).one()
+
+    plan = explain(conn, select(EventRegistration.id).where(
+        EventRegistration.event_id == event_id,
+        EventRegistration.user_id == user_id,
+        EventRegistration.status != Status.cancelled,
+    ))
+    assert_uses_index(plan, "uq_event_registrations_event_id_user_id_active")
+
+
+def test_waitlist_is_read_in_promotion_order(conn):
+    event_id = conn.scalar(select(EventRegistration.event_id).where(
+        EventRegistration.status == Status.waitlist
+    ).limit(1))
+
+    # the same query as promote_waitlist
+    plan = explain(conn, select(EventRegistration.id).where(
+        EventRegistration.event_id == event_id,
+        EventRegistration.status == Status.waitlist,
+    ).order_by(EventRegistration.registered_at, EventRegistration.id).limit(10))
+    assert_uses_index(plan, "ix_event_registrations_waitlist")
+    # the index already returns the oldest first
+    assert "Sort" not in plan and "TEMP B-TREE" not in plan, plan
+
+
+def test_user_lookup_by_email(conn):
+    # the same query as get_current_user
+    plan = explain(conn, select(User).where(User.email == "user1234@example.com"))
+    assert_uses_index(plan, "ix_users_email")
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Event, EventRegistration
+from app.models.models import RegistrationStatus as Status, utcnow
+from tests.conftest import auth, create_event, create_users
+
+pytestmark = pytest.mark.anyio
+
+# parallel registrations at one event; each is a commit, so the rate is bound by the
+# disk here; the floor catches gross regressions such as lock waits or retries
+REGISTRATIONS = 2000
+SEATS = 500
+MIN_REGISTRATIONS_PER_SECOND = float(os.environ.get("TEST_MIN_REGISTRATIONS_PER_SECOND", "25"))
+
+
+def seat_counts(engine, event_id: int):
+    with engine.connect() as conn:
+        confirmed_count = conn.scalar(select(Event.confirmed_count).where(Event.id == event_id))
+        confirmed = conn.scalar(select(func.count()).where(
+            EventRegistration.event_id == event_id,
+            EventRegistration.status == Status.confirmed,
+        ))
+    return confirmed_count, confirmed
+
+
+async def test_parallel_registrations_do_not_oversell(client, db):
+    organizer, *users = create_users(REGISTRATIONS + 1)
+    event_id = create_event(organizer, max_participants=SEATS)
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(
+        client.post(f"/events/{event_id}/register", headers=auth(user_id)) for user_id in users
+    ))
+    rate = len(users) / (time.perf_counter() - started)
+
+    assert [response.status_code for response in responses] == [201] * len(users)
+    statuses = [response.json()["status"] for response in responses]
+    assert statuses.count("confirmed") == SEATS
+    assert statuses.count("waitlist") == REGISTRATIONS - SEATS
+    assert seat_counts(db, event_id) == (SEATS, SEATS)
+    print(f"{rate:.0f} registrations/s")
+    assert rate >= MIN_REGISTRATIONS_PER_SECOND
+
+
+async def test_parallel_duplicate_registrations_take_one_seat(client, db):
+    organizer, user_id = create_users(2)
+    event_id = create_event(organizer, max_participants=10)
+
+    responses = await asyncio.gather(*(
+        client.post(f"/events/{event_id}/register", headers=auth(user_id)) for _ in range(10)
+    ))
+
+    assert sorted(response.status_code for response in responses) == [201] + [400] * 9
+    assert seat_counts(db, event_id) == (1, 1)
+
+
+async def test_registered_at_is_taken_from_the_app_clock(client, db):
+    organizer, user_id = create_users(2)
+    event_id = create_event(organizer)
+
+    before = utcnow()
+    await client.post(f"/events/{event_id}/register", headers=auth(user_id))
+    after = utcnow()
+
+    with db.connect() as conn:
+        registered_at = conn.scalar(select(EventRegistration.registered_at).where(EventRegistration.event_id == event_id))
+    # SQL now() would be the server's local time, at whole seconds on SQLite
+    assert before <= registered_at <= after
+
+
+async def test_import_allocates_seats_in_request_order(client, db):
+    organizer, *users = create_users(6)
+    event_id = create_event(organizer, max_participants=2)
+    await client.post(f"/events/{event_id}/register", headers=auth(users[0]))
+
+    response = await client.post(
+        f"/events/{event_id}/registrations/import",
+        json={"users": [users[0], "user3@example.com", users[1], users[2], "missing@example.com"]},
+        headers=auth(organizer),
+    )
+
+    assert response.status_code == 200
+    assert [entry["result"] for entry in response.json()["results"]] == [
+        "already_registered", "confirmed", "duplicate", "waitlist", "not_found"
+    ]
+    assert seat_counts(db, event_id) == (2, 2)
+
+
+async def test_import_into_inactive_event_is_refused(client, db):
+    organizer, user_id = create_users(2)
+    event_id = create_event(organizer, is_active=False)
+
+    response = await client.post(
+        f"/events/{event_id}/registrations/import", json={"users": [user_id]}, headers=auth(organizer)
+    )
+
+    assert response.status_code == 409
+    assert seat_counts(db, event_id) == (0, 0)
+
+
+async def test_bulk_cancel_frees_seats_for_the_waitlist(client, db):
+    organizer, *users = create_users(6)
+    event_id = create_event(organizer, max_participants=2)
+    for user_id in users:
+        await client.post(f"/events/{event_id}/register", headers=auth(user_id))
+
+    # unknown ids are ignored, the list may be as long as the schema allows
+    user_ids = users[:2] + list(range(1000, 10998))
+    response = await client.post(
+        f"/events/{event_id}/registrations/cancel", json={"user_ids": user_ids}, headers=auth(organizer)
+    )
+
+    assert response.json() == {"cancelled": 2, "promoted": 2}
+    assert seat_counts(db, event_id) == (2, 2)
+
+    response = await client.post(
+        f"/events/{event_id}/registrations/cancel", json={"user_ids": list(range(10001))}, headers=auth(organizer)
+    )
+    assert response.status_code == 422
+
+
+async def test_bulk_cancel_on_deleted_event_is_not_found(client, db):
+    organizer, user_id = create_users(2)
+    event_id = create_event(organizer, deleted_at=utcnow(), is_active=False)
+
+    response = await client.post(
+        f"/events/{event_id}/registrations/cancel", json={"user_ids": [user_id]}, headers=auth(organizer)
+    )
+
+    assert response.status_code == 404
+
+
+async def test_my_registrations_include_archived_ones(client, db):
+    from app.archive import archive_event
+    from app.database import SessionLocal
+
+    organizer, user = create_users(2)
+    past = create_event(organizer, end_datetime=utcnow())
+    upcoming = create_event(organizer)
+    for event_id in (past, upcoming):
+        await client.post(f"/events/{event_id}/register", headers=auth(user))
+    with SessionLocal() as session:
+        assert archive_event(session, past) == 1
+
+    pages = []
+    response = await client.get("/events/me/registrations?limit=1", headers=auth(user))
+    pages.append(response.json())
+    response = await client.get(
+        f"/events/me/registrations?limit=1&cursor={pages[0]['next_cursor']}", headers=auth(user)
+    )
+    pages.append(response.json())
+
+    assert [page["items"][0]["event"]["id"] for page in pages] == [upcoming, past]
+    assert pages[1]["next_cursor"] is None